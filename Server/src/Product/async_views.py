@@ -0,0 +1,153 @@
+import json
+
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition
+from rest_framework import exceptions, status
+
+from .serializers import ProductSerializer, StockGetTransactionSerializer
+from src.constant.Logging import get_logger
+from src.constant.Pagination import AsyncKeysetPagination
+from src.Usermgmt.authentication import CachedJWTAuthentication
+from src.utils.cache import product_list_cache, product_list_cache_key
+from src.utils.conditional import product_list_etag, stock_report_etag
+from src.utils.metrics import TimedJSONRenderer, section
+from src.utils.product import get_product_list_queryset, parse_product_fields
+from src.utils.sku_lookup import alookup_skus
+from src.utils.stock_export import date_range_filters, stock_report_queryset
+
+logger = get_logger(__name__)
+
+
+def json_response(data, status=status.HTTP_200_OK, headers=None):
+
+    # The DRF views' renderer, so both flavours of an endpoint send the same bytes.
+    return HttpResponse(TimedJSONRenderer().render(data), status=status, headers=headers, content_type='application/json')
+
+
+class AsyncAPIView(View):
+
+    # The part of APIView the async endpoints need: JWT authentication, an optional login
+    # requirement and DRF-shaped error bodies. DRF views cannot be async, so under ASGI each
+    # of them holds a thread for the whole request; these only leave the event loop while
+    # the async ORM runs a query.
+
+    authentication_classes = [CachedJWTAuthentication]
+    login_required = False
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Token-authenticated like the DRF views, which are exempt as well.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            await self.perform_authentication(request)
+        except exceptions.APIException as e:
+            return self.handle_exception(request, e)
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def perform_authentication(self, request):
+        for authenticator in (auth() for auth in self.authentication_classes):
+            result = await authenticator.aauthenticate(request)
+            if result is not None:
+                request.user, request.auth = result
+                return
+        if self.login_required:
+            raise exceptions.NotAuthenticated()
+
+    def handle_exception(self, request, exc):
+        headers = {}
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)) and self.authentication_classes:
+            headers['WWW-Authenticate'] = self.authentication_classes[0]().authenticate_header(request)
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        return json_response(data, status=exc.status_code, headers=headers)
+
+
+
+class AsyncProductListView(AsyncAPIView):
+
+    read_from_replica = True
+
+    @method_decorator(condition(etag_func=product_list_etag))
+    async def get(self, request):
+        try:
+            cache_key = product_list_cache_key(request)
+            data = product_list_cache.get(cache_key)
+            if data is not None:
+                return json_response(data)
+
+            fields, includes = parse_product_fields(request.GET)
+            include_variants = 'variants' in includes
+            paginator = AsyncKeysetPagination()
+            page = await paginator.paginate_queryset(get_product_list_queryset(fields, include_variants), request)
+            if fields is not None and include_variants:
+                fields = fields + ['variants']
+            serializer = ProductSerializer(page, many=True, fields=fields)
+            with section('serialize'):
+                data = serializer.data
+
+            logger.info("Returning %d products after pagination", len(data))
+            data = paginator.get_paginated_data(data)
+            product_list_cache.set(cache_key, data)
+            return json_response(data)
+
+        except Exception as e:
+            logger.error("Error listing products: %s", e)
+            return json_response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+
+class AsyncStockTransactionListView(AsyncAPIView):
+
+    read_from_replica = True
+
+    @method_decorator(condition(etag_func=stock_report_etag))
+    async def get(self, request):
+        start_date = request.GET.get("start_date")
+        end_date = request.GET.get("end_date")
+        logger.info("Fetching stock transactions: start_date=%s, end_date=%s", start_date, end_date)
+
+        try:
+            paginator = AsyncKeysetPagination()
+            page = await paginator.paginate_queryset(
+                stock_report_queryset(date_range_filters(start_date, end_date)), request,
+            )
+        except ValueError as e:
+            logger.warning("Invalid stock report request: %s", e)
+            return json_response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        with section('serialize'):
+            data = StockGetTransactionSerializer(page, many=True).data
+        return json_response(paginator.get_paginated_data(data))
+
+
+
+class AsyncSkuScanView(AsyncAPIView):
+
+    login_required = True
+    max_skus = 500
+
+    async def get(self, request, sku):
+        result = (await alookup_skus([sku])).get(sku)
+        if result is None:
+            return json_response({'error': 'SKU not found'}, status=status.HTTP_404_NOT_FOUND)
+        return json_response(result)
+
+    async def post(self, request):
+        try:
+            skus = json.loads(request.body).get("skus")
+        except (ValueError, AttributeError):
+            skus = None
+        if not isinstance(skus, list) or not all(isinstance(sku, str) for sku in skus):
+            return json_response({'error': 'skus must be a list of strings'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(skus) > self.max_skus:
+            return json_response({'error': f'At most {self.max_skus} skus per request'}, status=status.HTTP_400_BAD_REQUEST)
+
+        found = await alookup_skus(skus)
+        return json_response({
+            'results': [found[sku] for sku in dict.fromkeys(skus) if sku in found],
+            'missing': [sku for sku in dict.fromkeys(skus) if sku not in found],
+        })
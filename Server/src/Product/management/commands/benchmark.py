@@ -0,0 +1,166 @@
+import itertools
+import json
+import platform
+import sqlite3
+from datetime import datetime, timezone as dt_timezone
+from statistics import median
+
+import django
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from src.utils.benchmark import (
+    benchmark_database, get_benchmark_user, peak_memory_kb, seed_catalog, seed_transactions,
+    seeded_uuids, server_timing_queries, summarize, timed,
+)
+from src.utils.cache import product_list_cache
+
+# Ledger dates are spread back from a fixed point so every run seeds the same rows.
+SEED_EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+REGISTER_START_ID = 900000
+
+
+class Command(BaseCommand):
+    help = "Seed a throwaway database deterministically and benchmark the main API paths, reporting JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=500)
+        parser.add_argument('--variants', type=int, default=3)
+        parser.add_argument('--options', type=int, default=4)
+        parser.add_argument('--transactions', type=int, default=100_000)
+        parser.add_argument('--requests', type=int, default=100, help="Timed requests per scenario.")
+        parser.add_argument('--deep-pages', type=int, default=20, help="Cursor pages to follow for the deep-page scenarios.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help="Write the JSON results to this file instead of stdout.")
+        parser.add_argument('--compare', help="Earlier JSON results to print p95 changes against.")
+        parser.add_argument('--keepdb', action='store_true')
+
+    def handle(self, *args, **options):
+
+        with benchmark_database(keepdb=options['keepdb']):
+            user = get_benchmark_user()
+            new_id = seeded_uuids(options['seed'])
+            sub_variants = seed_catalog(
+                user, options['products'], variants=options['variants'], options=options['options'], new_id=new_id,
+            )
+            sub_variant_ids = [str(sv.id) for sv in sub_variants]
+            _, seed_ms = timed(
+                seed_transactions, user, [sv.id for sv in sub_variants], options['transactions'],
+                new_id=new_id, now=SEED_EPOCH,
+            )
+            self.stderr.write(f"Seeded {len(sub_variants)} options and {options['transactions']} transactions in {seed_ms / 1000:.1f}s")
+
+            client = self.authenticated_client()
+            scenarios = self.scenarios(client, sub_variant_ids, options['deep_pages'])
+            results = {name: self.measure(request, options['requests']) for name, request in scenarios.items()}
+
+        report = {
+            'meta': {
+                'created': timezone.now().isoformat(),
+                'seed': options['seed'],
+                'products': options['products'],
+                'variants': options['variants'],
+                'options': options['options'],
+                'transactions': options['transactions'],
+                'requests': options['requests'],
+                'deep_pages': options['deep_pages'],
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'sqlite': sqlite3.sqlite_version,
+            },
+            'scenarios': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(f"Results written to {options['output']}")
+        else:
+            self.stdout.write(output)
+
+        if options['compare']:
+            self.compare(options['compare'], results)
+
+    def authenticated_client(self):
+
+        client = Client()
+        response = client.post(reverse('token_obtain_pair'), {'email': 'benchmark@example.com', 'password': 'benchmark-pass-123'})
+        return Client(headers={'Authorization': f"Bearer {response.json()['access']}"})
+
+    def follow(self, client, url, pages):
+
+        for _ in range(pages):
+            next_url = client.get(url).json().get('next')
+            if not next_url:
+                break
+            url = next_url
+        return url
+
+    def scenarios(self, client, sub_variant_ids, deep_pages):
+
+        list_url = reverse('product_list')
+        report_url = reverse('stock_transaction_list')
+        deep_list_url = self.follow(client, list_url, deep_pages)
+        deep_report_url = self.follow(client, report_url, deep_pages)
+        product_ids = itertools.count(REGISTER_START_ID)
+        options = itertools.cycle(sub_variant_ids)
+
+        def register():
+            product_id = next(product_ids)
+            return client.post(reverse('product_register'), {
+                'ProductID': product_id,
+                'ProductCode': f'PROD-{product_id}',
+                'ProductName': f'Registered Product {product_id}',
+                'variants': [{'name': 'Size', 'options': [{'value': 'S', 'stock': '5'}, {'value': 'M', 'stock': '5'}]}],
+            }, content_type='application/json')
+
+        def uncached(url):
+            # Every poll here is a cache miss, so the timing covers the queries and serializer.
+            def request():
+                product_list_cache.clear()
+                return client.get(url)
+            return request
+
+        def move(name):
+            return lambda: client.post(reverse(name), {'sub_variant_id': next(options), 'quantity': '1'})
+
+        return {
+            'register': register,
+            'list_first_page': uncached(list_url),
+            'list_deep_page': uncached(deep_list_url),
+            'add_stock': move('add_stock'),
+            'remove_stock': move('remove_stock'),
+            'report_first_page': lambda: client.get(report_url),
+            'report_deep_page': lambda: client.get(deep_report_url),
+        }
+
+    def measure(self, request, count):
+
+        request()  # warm-up
+        samples, queries, errors = [], [], 0
+        for _ in range(count):
+            response, elapsed = timed(request)
+            samples.append(elapsed)
+            queries.append(server_timing_queries(response) or 0)
+            errors += response.status_code >= 400
+
+        return {
+            **summarize(samples),
+            'queries_p50': median(queries) if queries else 0,
+            'queries_max': max(queries, default=0),
+            'peak_memory_kb': peak_memory_kb(request),
+            'errors': errors,
+        }
+
+    def compare(self, path, results):
+
+        with open(path) as handle:
+            previous = json.load(handle)['scenarios']
+        for name, result in results.items():
+            if name not in previous:
+                continue
+            before, after = previous[name]['p95_ms'], result['p95_ms']
+            change = (after - before) / before * 100 if before else 0.0
+            self.stderr.write(f"{name}: p95 {before:.2f}ms -> {after:.2f}ms ({change:+.1f}%)")
@@ -0,0 +1,47 @@
+import itertools
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from src.Usermgmt.authentication import user_cache
+from src.utils.benchmark import (
+    benchmark_database, get_benchmark_user, seed_catalog, server_timing_queries, summarize, timed,
+)
+
+
+class Command(BaseCommand):
+    help = "Compare JWT-authenticated stock writes with the user cache cold on every request and warm."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--keepdb', action='store_true')
+
+    def handle(self, *args, **options):
+
+        with benchmark_database(keepdb=options['keepdb']):
+            user = get_benchmark_user()
+            sub_variants = seed_catalog(user, 20)
+            options_ids = itertools.cycle([str(sv.id) for sv in sub_variants])
+            token = RefreshToken.for_user(user).access_token
+            client = Client(headers={'Authorization': f'Bearer {token}'})
+            url = reverse('add_stock')
+            # One pass over every option first, so both runs update existing rollup rows.
+            for _ in sub_variants:
+                client.post(url, {'sub_variant_id': next(options_ids), 'quantity': '1'})
+
+            # A cold cache on every request is what plain JWTAuthentication costs.
+            for label, clear in (('cold', True), ('warm', False)):
+                samples, queries = [], []
+                user_cache.clear()
+                for _ in range(options['requests']):
+                    if clear:
+                        user_cache.clear()
+                    response, elapsed = timed(client.post, url, {'sub_variant_id': next(options_ids), 'quantity': '1'})
+                    samples.append(elapsed)
+                    queries.append(server_timing_queries(response))
+                self.stdout.write(
+                    f"{label}: {summarize(samples)} queries/request={sorted(queries)[len(queries) // 2]} "
+                    f"cache={user_cache.stats()}"
+                )
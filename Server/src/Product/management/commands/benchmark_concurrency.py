@@ -0,0 +1,251 @@
+import asyncio
+import itertools
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from src.utils.benchmark import (
+    benchmark_database, get_benchmark_user, seed_catalog, seed_transactions, seeded_uuids, summarize,
+)
+
+# name -> (application, uvicorn interface, which flavour of the read endpoints to hit)
+DEPLOYMENTS = {
+    'wsgi': ('src.wsgi:application', 'wsgi', 'sync'),
+    'asgi-sync': ('src.asgi:application', 'asgi3', 'sync'),
+    'asgi-async': ('src.asgi:application', 'asgi3', 'async'),
+}
+ENDPOINTS = {
+    'sync': {'list': 'product_list', 'report': 'stock_transaction_list', 'scan': 'sku_scan'},
+    'async': {'list': 'async_product_list', 'report': 'async_stock_transaction_list', 'scan': 'async_sku_scan'},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve a seeded throwaway database under uvicorn as WSGI and as ASGI, drive the product list, "
+        "stock report and SKU scan with many concurrent keep-alive clients, and report throughput "
+        "and latency percentiles as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=200)
+        parser.add_argument('--duration', type=float, default=15, help="Measured seconds per deployment.")
+        parser.add_argument('--warmup', type=float, default=3, help="Unmeasured seconds before each measurement.")
+        parser.add_argument('--deployments', default=','.join(DEPLOYMENTS), help="Comma-separated subset of: " + ', '.join(DEPLOYMENTS))
+        parser.add_argument('--products', type=int, default=500)
+        parser.add_argument('--transactions', type=int, default=20_000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--output', help="Write the JSON results to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+
+        try:
+            import uvicorn  # noqa: F401
+        except ImportError:
+            raise CommandError("benchmark_concurrency needs uvicorn: pip install uvicorn")
+        deployments = [name.strip() for name in options['deployments'].split(',') if name.strip()]
+        unknown = [name for name in deployments if name not in DEPLOYMENTS]
+        if unknown:
+            raise CommandError(f"Unknown deployments: {', '.join(unknown)}")
+
+        with benchmark_database():
+            user = get_benchmark_user()
+            new_id = seeded_uuids(options['seed'])
+            sub_variants = seed_catalog(user, options['products'], new_id=new_id)
+            seed_transactions(user, [sv.id for sv in sub_variants], options['transactions'], new_id=new_id)
+            token = str(RefreshToken.for_user(user).access_token)
+            skus = [sv.sku for sv in sub_variants]
+            database = connections['default'].settings_dict['NAME']
+            # The servers open their own connections to the file.
+            connections.close_all()
+
+            results = {}
+            for name in deployments:
+                app, interface, flavour = DEPLOYMENTS[name]
+                paths = self.request_paths(flavour, skus)
+                with serve(app, interface, options['port'], database):
+                    results[name] = asyncio.run(self.load(
+                        options['port'], paths, token, options['clients'], options['warmup'], options['duration'],
+                    ))
+                self.stderr.write(
+                    f"{name}: {results[name]['throughput_rps']} req/s, "
+                    f"p99 {results[name]['latency']['p99_ms']}ms, errors {results[name]['errors']}"
+                )
+
+        report = {
+            'meta': {
+                'created': timezone.now().isoformat(),
+                'clients': options['clients'],
+                'duration_s': options['duration'],
+                'products': options['products'],
+                'transactions': options['transactions'],
+                'cpus': os.cpu_count(),
+                'python': platform.python_version(),
+                'server': f"uvicorn {uvicorn_version()}",
+            },
+            'deployments': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(f"Results written to {options['output']}")
+        else:
+            self.stdout.write(output)
+
+    def request_paths(self, flavour, skus):
+
+        # Every client cycles list -> report -> scan, starting at a different point.
+        names = ENDPOINTS[flavour]
+        sku_cycle = itertools.cycle(skus)
+        return {
+            'list': lambda: reverse(names['list']),
+            'report': lambda: reverse(names['report']),
+            'scan': lambda: reverse(names['scan'], args=[next(sku_cycle)]),
+        }
+
+    async def load(self, port, paths, token, clients, warmup, duration):
+
+        start = time.perf_counter()
+        measure_from = start + warmup
+        stop_at = measure_from + duration
+        samples = defaultdict(list)
+        statuses = defaultdict(int)
+        errors = 0
+        kinds = list(paths)
+
+        async def client(index):
+            nonlocal errors
+            connection = None
+            for i in itertools.count(index):
+                if time.perf_counter() >= stop_at:
+                    break
+                kind = kinds[i % len(kinds)]
+                request = (
+                    f"GET {paths[kind]()} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+                    f"Authorization: Bearer {token}\r\n\r\n"
+                ).encode()
+                began = time.perf_counter()
+                try:
+                    if connection is None:
+                        connection = await asyncio.open_connection('127.0.0.1', port)
+                    status, keep_alive = await http_request(*connection, request)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    if began >= measure_from:
+                        errors += 1
+                    connection = close(connection)
+                    await asyncio.sleep(0.05)
+                    continue
+                if not keep_alive:
+                    connection = close(connection)
+                if began >= measure_from and time.perf_counter() <= stop_at:
+                    samples[kind].append((time.perf_counter() - began) * 1000)
+                    statuses[status] += 1
+            close(connection)
+
+        await asyncio.gather(*(client(index) for index in range(clients)))
+
+        every = [sample for kind_samples in samples.values() for sample in kind_samples]
+        return {
+            'throughput_rps': round(len(every) / duration, 1),
+            'latency': summarize(every),
+            'endpoints': {kind: summarize(kind_samples) for kind, kind_samples in samples.items()},
+            'statuses': {str(status): count for status, count in sorted(statuses.items())},
+            'errors': errors,
+        }
+
+
+@contextmanager
+def serve(app, interface, port, database):
+
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'src.settings',
+        'DB_NAME': str(database),
+        'DB_REPLICA_NAME': str(database),
+        'LOG_LEVEL': 'WARNING',
+    }
+    with tempfile.TemporaryFile() as errors:
+        process = subprocess.Popen(
+            [
+                sys.executable, '-m', 'uvicorn', app, '--interface', interface,
+                '--host', '127.0.0.1', '--port', str(port), '--backlog', '2048',
+                '--log-level', 'warning', '--no-access-log',
+            ],
+            cwd=settings.BASE_DIR, env=env, stderr=errors,
+        )
+        try:
+            wait_until_listening(process, port, errors)
+            yield process
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+def wait_until_listening(process, port, errors, timeout=30):
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            errors.seek(0)
+            raise CommandError(f"Server exited early:\n{errors.read().decode()}")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise CommandError(f"Server did not start listening on port {port}")
+
+
+async def http_request(reader, writer, request):
+
+    # A minimal HTTP/1.1 exchange; enough to time requests without a client library.
+    writer.write(request)
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise asyncio.IncompleteReadError(b'', None)
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        while size := int((await reader.readline()).strip(), 16):
+            await reader.readexactly(size + 2)
+        await reader.readline()
+    return int(status_line.split()[1]), headers.get('connection', '').lower() != 'close'
+
+
+def close(connection):
+
+    if connection is not None:
+        connection[1].close()
+    return None
+
+
+def uvicorn_version():
+
+    import uvicorn
+    return uvicorn.__version__
@@ -0,0 +1,87 @@
+import contextlib
+import itertools
+import threading
+from collections import Counter
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from src.Usermgmt.views import LoginView
+from src.utils.benchmark import benchmark_database, get_benchmark_user, seed_catalog, summarize, timed
+
+
+class Command(BaseCommand):
+    help = "Time stock updates while threads flood the login endpoint, with and without the auth throttles."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Timed add_stock requests per phase.")
+        parser.add_argument('--flooders', type=int, default=8)
+        parser.add_argument('--ips', type=int, default=4, help="Distinct client addresses the flood rotates through.")
+        parser.add_argument('--keepdb', action='store_true')
+
+    def handle(self, *args, **options):
+
+        with benchmark_database(keepdb=options['keepdb']):
+            user = get_benchmark_user()
+            sub_variants = itertools.cycle([str(sv.id) for sv in seed_catalog(user, 20)])
+            client = Client(headers={'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'})
+            url = reverse('add_stock')
+
+            def stock_latency():
+                samples = []
+                for _ in range(options['requests']):
+                    _, elapsed = timed(client.post, url, {'sub_variant_id': next(sub_variants), 'quantity': '1'})
+                    samples.append(elapsed)
+                return summarize(samples)
+
+            stock_latency()  # warm-up
+            self.stdout.write(f"baseline: {stock_latency()}")
+
+            unprotected = (
+                mock.patch.object(LoginView, 'throttle_classes', []),
+                mock.patch('src.Usermgmt.views.hashing_slot', contextlib.nullcontext),
+            )
+            for label, patches in (('flood, throttled', ()), ('flood, unthrottled', unprotected)):
+                cache.clear()
+                with contextlib.ExitStack() as stack:
+                    for patch in patches:
+                        stack.enter_context(patch)
+                    statuses, latency = self.flood(options['flooders'], options['ips'], stock_latency)
+                self.stdout.write(f"{label}: {latency} login responses={dict(statuses)}")
+
+    def flood(self, flooders, ips, measure):
+
+        # Wrong passwords for rotating emails and addresses, like a credential-stuffing run.
+        stop = threading.Event()
+        statuses = Counter()
+        lock = threading.Lock()
+
+        def worker(seed):
+            login = Client()
+            try:
+                for i in itertools.count():
+                    if stop.is_set():
+                        break
+                    response = login.post(reverse('auth_login'), {
+                        'email': f'victim{(seed * 7919 + i) % 50}@example.com', 'password': 'wrong-password',
+                    }, REMOTE_ADDR=f'10.0.0.{(seed + i) % ips + 1}')
+                    with lock:
+                        statuses[response.status_code] += 1
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(flooders)]
+        for thread in threads:
+            thread.start()
+        try:
+            latency = measure()
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        return statuses, latency
@@ -0,0 +1,65 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from src.Product.models import Products
+from src.utils.benchmark import benchmark_database, get_benchmark_user, seed_catalog
+from src.utils.sequence import SequenceAllocator
+
+
+class Command(BaseCommand):
+    help = "Measure ProductID allocation rate under concurrent registrations."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--registrations', type=int, default=500, help="Registrations per thread.")
+        parser.add_argument('--block-sizes', type=int, nargs='+', default=[1, 10, 50, 200])
+
+    def handle(self, *args, **options):
+        
+        with benchmark_database():
+            user = get_benchmark_user()
+            seed_catalog(user, 1000, variants=1, options=1)
+
+            for block_size in options['block_sizes']:
+                allocator = SequenceAllocator(f'bench-{block_size}', initial=lambda: 10_000_000 * block_size, block_size=block_size)
+                self.run(allocator, user, options['threads'], options['registrations'])
+
+    def run(self, allocator, user, threads, registrations):
+        
+        allocated = []
+        failures = []
+
+        def register():
+            ids = []
+            try:
+                for _ in range(registrations):
+                    product_id = allocator.next()
+                    ids.append(product_id)
+                    Products.objects.create(
+                        ProductID=product_id,
+                        ProductCode=f'PROD-{product_id}',
+                        ProductName='Benchmark registration',
+                        CreatedUser=user,
+                    )
+            except Exception as e:
+                failures.append(str(e))
+            finally:
+                allocated.extend(ids)
+                connection.close()
+
+        workers = [threading.Thread(target=register) for _ in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"block={allocator.block_size:<4} registrations={len(allocated)} "
+            f"rate={len(allocated) / elapsed:.0f}/s duplicates={len(allocated) - len(set(allocated))} "
+            f"failures={len(failures)}"
+        )
@@ -0,0 +1,69 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+from django.utils import timezone
+
+from src.Product.models import SubVariant, StockSnapshot, StockTransaction
+from src.utils.benchmark import (
+    benchmark_database, get_benchmark_user, seed_catalog, seed_transactions, summarize, timed,
+)
+from src.utils.stock_snapshot import SIGNED_QUANTITY, ledger_delta, stock_as_of
+
+
+class Command(BaseCommand):
+    help = "Compare snapshot-based 'stock as of' lookups with a full ledger replay."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transactions', type=int, default=1_000_000)
+        parser.add_argument('--products', type=int, default=5)
+        parser.add_argument('--days', type=int, default=90)
+        parser.add_argument('--snapshot-every', type=int, default=7, help="Days between checkpoints.")
+        parser.add_argument('--lookups', type=int, default=200)
+
+    def handle(self, *args, **options):
+        
+        days = options['days']
+        with benchmark_database():
+            user = get_benchmark_user()
+            options_rows = seed_catalog(user, options['products'], stock=Decimal('0'))
+            ids = [option.id for option in options_rows]
+            seed_transactions(user, ids, options['transactions'], days=days)
+            self.stdout.write(f"Seeded {options['transactions']} transactions over {len(ids)} options")
+
+            # The ledger is the only source of stock here, so balances are its running sum.
+            for row in self.balances(None):
+                SubVariant.objects.filter(id=row['sub_variant_id']).update(stock=row['total'])
+
+            now = timezone.now()
+            for day in range(days, 0, -options['snapshot_every']):
+                taken_at = now - timedelta(days=day)
+                StockSnapshot.objects.bulk_create(
+                    StockSnapshot(sub_variant_id=row['sub_variant_id'], taken_at=taken_at, stock=row['total'])
+                    for row in self.balances(taken_at)
+                )
+
+            rng = random.Random(42)
+            options_by_id = {option.id: option for option in SubVariant.objects.filter(id__in=ids)}
+            snapshot_samples, replay_samples = [], []
+            for _ in range(options['lookups']):
+                option = options_by_id[rng.choice(ids)]
+                at = now - timedelta(seconds=rng.uniform(0, days * 86400))
+                from_snapshot, snapshot_ms = timed(stock_as_of, option, at)
+                from_replay, replay_ms = timed(ledger_delta, option.id, None, at)
+                if from_snapshot != from_replay:
+                    self.stderr.write(f"Mismatch for {option.id} at {at}: {from_snapshot} != {from_replay}")
+                snapshot_samples.append(snapshot_ms)
+                replay_samples.append(replay_ms)
+
+            self.stdout.write(f"snapshot + delta: {summarize(snapshot_samples)}")
+            self.stdout.write(f"full replay:      {summarize(replay_samples)}")
+
+    def balances(self, until):
+        
+        transactions = StockTransaction.objects.all()
+        if until is not None:
+            transactions = transactions.filter(CreatedDate__lte=until)
+        return transactions.values('sub_variant_id').annotate(total=Sum(SIGNED_QUANTITY)).order_by()
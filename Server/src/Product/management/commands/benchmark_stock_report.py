@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from src.utils.benchmark import (
+    benchmark_database, get_benchmark_user, seed_catalog, seed_transactions, summarize, timed,
+)
+
+
+class Command(BaseCommand):
+    help = "Seed a throwaway database with a large stock ledger and time stock-report pages."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transactions', type=int, default=1_000_000)
+        parser.add_argument('--products', type=int, default=500)
+        parser.add_argument('--pages', type=int, default=200)
+        parser.add_argument('--keepdb', action='store_true')
+
+    def handle(self, *args, **options):
+        
+        with benchmark_database(keepdb=options['keepdb']):
+            user = get_benchmark_user()
+            sub_variants = seed_catalog(user, options['products'])
+            self.stdout.write(f"Seeding {options['transactions']} transactions...")
+            _, seed_ms = timed(seed_transactions, user, [sv.id for sv in sub_variants], options['transactions'])
+            self.stdout.write(f"Seeded in {seed_ms / 1000:.1f}s")
+
+            client = Client()
+            url = reverse('stock_transaction_list')
+            samples = []
+            for page in range(1, options['pages'] + 1):
+                response, elapsed = timed(client.get, url)
+                if response.status_code != 200:
+                    self.stderr.write(f"Page {page} failed with {response.status_code}")
+                    break
+                samples.append(elapsed)
+                url = response.json()['next']
+                if not url:
+                    break
+
+            quarter = max(1, len(samples) // 4)
+            self.stdout.write(f"first page: {samples[0]:.2f}ms")
+            self.stdout.write(f"first {quarter} pages: {summarize(samples[:quarter])}")
+            self.stdout.write(f"last {quarter} pages:  {summarize(samples[-quarter:])}")
+            self.stdout.write(f"all pages: {summarize(samples)}")
@@ -0,0 +1,34 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from src.utils.stock_export import EXPORT_FORMATS, date_range_filters, stream_stock_export
+
+
+class Command(BaseCommand):
+    help = "Stream stock transactions for a date range to a CSV or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date')
+        parser.add_argument('--end-date')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument('--output', default='-', help="Output path, '-' for stdout.")
+
+    def handle(self, *args, **options):
+        
+        try:
+            filters = date_range_filters(options['start_date'], options['end_date'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        chunks = stream_stock_export(filters, options['format'], options['gzip'])
+        if options['output'] == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+
+        with open(options['output'], 'wb') as output:
+            for chunk in chunks:
+                output.write(chunk)
@@ -0,0 +1,34 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from src.Usermgmt.models import CustomUser
+from src.utils.catalog_import import import_products
+
+
+class Command(BaseCommand):
+    help = "Bulk import a product catalog from a CSV or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--user', required=True, help="Email of the user recorded as CreatedUser.")
+        parser.add_argument('--format', choices=['csv', 'jsonl'])
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        
+        path = Path(options['path'])
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in ('csv', 'jsonl'):
+            raise CommandError("Cannot infer the format, pass --format csv or --format jsonl")
+
+        try:
+            user = CustomUser.objects.get(email=options['user'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"User {options['user']} not found")
+
+        with path.open(newline='', encoding='utf-8') as stream:
+            report = import_products(stream, file_format, user, chunk_size=options['chunk_size'])
+
+        self.stdout.write(json.dumps(report.as_dict(), indent=2))
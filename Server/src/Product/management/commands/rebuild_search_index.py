@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from src.utils.search import rebuild_index, search_enabled
+
+
+class Command(BaseCommand):
+    help = "Rebuild the product full-text search index from the catalog."
+
+    def handle(self, *args, **options):
+        
+        if not search_enabled():
+            self.stderr.write("The FTS5 search index is only available on SQLite")
+            return
+        self.stdout.write(f"Indexed {rebuild_index()} products")
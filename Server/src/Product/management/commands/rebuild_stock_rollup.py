@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from src.utils.stock_rollup import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily stock rollup table from the full stock ledger."
+
+    def handle(self, *args, **options):
+        
+        created = rebuild_rollups()
+        self.stdout.write(f"Rebuilt {created} rollup rows")
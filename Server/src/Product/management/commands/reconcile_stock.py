@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from src.utils.stock_reconcile import reconcile_total_stock
+
+
+class Command(BaseCommand):
+    help = "Compare Products.TotalStock with the sum of its options' stock and fix any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--incremental', action='store_true', help="Only check products changed since the last run.")
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without fixing it or moving the checkpoint.")
+
+    def handle(self, *args, **options):
+        
+        report = reconcile_total_stock(incremental=options['incremental'], fix=not options['dry_run'])
+        for row in report['discrepancies']:
+            self.stdout.write(
+                f"{row['ProductCode']}: recorded {row['recorded']} actual {row['actual']} ({row['difference']:+})"
+            )
+        since = f" since {report['since'].isoformat()}" if report['since'] else ""
+        self.stdout.write(
+            f"{report['mode'].capitalize()} check{since}: {len(report['discrepancies'])} discrepancies, {report['fixed']} fixed"
+        )
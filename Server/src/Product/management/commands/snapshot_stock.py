@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from src.utils.stock_snapshot import compact_snapshots, take_snapshot
+
+
+class Command(BaseCommand):
+    help = "Record a checkpoint of every SubVariant balance, optionally compacting old checkpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--compact', action='store_true', help="Thin out old checkpoints after snapshotting.")
+        parser.add_argument('--keep-days', type=int, default=30)
+        parser.add_argument('--weekly-days', type=int, default=365)
+
+    def handle(self, *args, **options):
+        
+        taken_at, created = take_snapshot()
+        self.stdout.write(f"Snapshot of {created} balances at {taken_at.isoformat()}")
+
+        if options['compact']:
+            deleted = compact_snapshots(options['keep_days'], options['weekly_days'])
+            self.stdout.write(f"Compacted {deleted} old snapshot rows")
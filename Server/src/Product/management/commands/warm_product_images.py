@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from src.Product.models import Products
+from src.utils.image_renditions import warm_product_image
+
+
+class Command(BaseCommand):
+    help = "Generate the configured ProductImage renditions for existing products."
+
+    def handle(self, *args, **options):
+        
+        created = 0
+        failed = []
+        products = Products.objects.exclude(ProductImage='').exclude(ProductImage__isnull=True)
+        for product_id in products.values_list('id', flat=True).iterator():
+            count, failures = warm_product_image(product_id)
+            created += count
+            failed.extend(failures)
+
+        self.stdout.write(f"Created {created} renditions, {len(failed)} failed")
+        for path in failed:
+            self.stderr.write(f"  {path}")
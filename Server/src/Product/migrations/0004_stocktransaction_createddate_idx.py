@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Product', '0003_remove_stocktransaction_products_st_sub_var_3eb6d1_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='subvariant',
+            name='stock',
+            field=models.DecimalField(decimal_places=8, default=0.0, max_digits=20),
+        ),
+        migrations.AddIndex(
+            model_name='stocktransaction',
+            index=models.Index(fields=['CreatedDate'], name='products_st_Created_fc98be_idx'),
+        ),
+    ]
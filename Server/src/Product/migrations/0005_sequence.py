@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Product', '0004_stocktransaction_createddate_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Sequence',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField()),
+            ],
+            options={
+                'db_table': 'products_sequence',
+            },
+        ),
+    ]
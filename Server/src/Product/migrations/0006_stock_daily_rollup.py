@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Product', '0005_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('transaction_type', models.CharField(choices=[('IN', 'Stock In'), ('OUT', 'Stock Out')], max_length=20)),
+                ('quantity', models.DecimalField(decimal_places=8, default=0, max_digits=20)),
+                ('transaction_count', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_rollups', to='Product.products')),
+                ('sub_variant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_rollups', to='Product.subvariant')),
+            ],
+            options={
+                'db_table': 'products_stock_daily_rollup',
+                'indexes': [models.Index(fields=['product', 'day'], name='products_st_product_444278_idx'), models.Index(fields=['day'], name='products_st_day_826eb8_idx')],
+                'constraints': [models.UniqueConstraint(fields=('sub_variant', 'day', 'transaction_type'), name='unique_stock_rollup_bucket')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Product', '0006_stock_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField()),
+                ('stock', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('sub_variant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='Product.subvariant')),
+            ],
+            options={
+                'db_table': 'products_stock_snapshot',
+                'indexes': [models.Index(fields=['taken_at'], name='products_st_taken_a_e8cf02_idx')],
+                'constraints': [models.UniqueConstraint(fields=('sub_variant', 'taken_at'), name='unique_stock_snapshot')],
+            },
+        ),
+    ]
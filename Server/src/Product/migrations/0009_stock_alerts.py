@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:29
+
+import django.db.models.deletion
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Product', '0008_product_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alert_type', models.CharField(choices=[('LOW', 'Fell to reorder level'), ('CLEARED', 'Restocked above reorder level')], max_length=20)),
+                ('stock', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('reorder_level', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('CreatedDate', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'products_stock_alert',
+            },
+        ),
+        migrations.AddField(
+            model_name='subvariant',
+            name='reorder_level',
+            field=models.DecimalField(decimal_places=8, default=0, max_digits=20),
+        ),
+        migrations.AddIndex(
+            model_name='subvariant',
+            index=models.Index(models.ExpressionWrapper(django.db.models.expressions.CombinedExpression(models.F('stock'), '-', models.F('reorder_level')), output_field=models.FloatField()), models.F('id'), condition=models.Q(('reorder_level__gt', 0)), name='subvariant_stock_margin_idx'),
+        ),
+        migrations.AddField(
+            model_name='stockalert',
+            name='sub_variant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_alerts', to='Product.subvariant'),
+        ),
+        migrations.AddIndex(
+            model_name='stockalert',
+            index=models.Index(fields=['CreatedDate'], name='products_st_Created_420055_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:57
+
+from datetime import datetime, timezone
+
+from django.db import migrations, models
+
+
+def move_checkpoint(apps, schema_editor):
+    # The checkpoint used to sit in the ProductID sequence table as microseconds.
+    Sequence = apps.get_model('Product', 'Sequence')
+    ReconcileCheckpoint = apps.get_model('Product', 'ReconcileCheckpoint')
+    for row in Sequence.objects.filter(name='TotalStockReconcile'):
+        checked_at = datetime.fromtimestamp(row.value / 1_000_000, tz=timezone.utc)
+        ReconcileCheckpoint.objects.update_or_create(name=row.name, defaults={'checked_at': checked_at})
+        row.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Product', '0009_stock_alerts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReconcileCheckpoint',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('checked_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'products_reconcile_checkpoint',
+            },
+        ),
+        migrations.RunPython(move_checkpoint, migrations.RunPython.noop),
+    ]
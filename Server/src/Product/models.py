@@ -1,5 +1,6 @@
 import uuid
 from django.db import models
+from django.db.models import ExpressionWrapper, F, FloatField, Q
 from django.utils.translation import gettext_lazy as _
 from versatileimagefield.fields import VersatileImageField
 from src.Usermgmt.models import CustomUser
@@ -40,18 +41,35 @@ class Variant(models.Model):
             models.Index(fields=['product', 'name'])
         ]
 
+# Stock above the reorder level; shared by the partial index and the low-stock query so
+# SQLite can match the two expressions. A float is all SQLite has here: it stores these
+# decimals as REAL, so the difference is a double whatever the output field says. Its sign
+# still matches comparing stock and reorder level directly, which is what the feed filters
+# on, and the cursor round-trips the exact double. The margin is only used to filter and
+# order; shortfalls shown to users come from the decimal columns.
+STOCK_MARGIN = ExpressionWrapper(F('stock') - F('reorder_level'), output_field=FloatField())
+
+
 class SubVariant(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     variant = models.ForeignKey(Variant, related_name='options', on_delete=models.CASCADE)
     value = models.CharField(max_length=100)
     stock = models.DecimalField(default=0.00, max_digits=20, decimal_places=8)
     sku = models.CharField(max_length=255, unique=True)
+    reorder_level = models.DecimalField(default=0, max_digits=20, decimal_places=8)
     CreatedDate = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = "products_subvariant"
         indexes = [
-            models.Index(fields=['variant', 'value'])
+            models.Index(fields=['variant', 'value']),
+            # Only options with a reorder level are indexed, ordered by how far stock sits
+            # above it, so the low-stock feed reads the index front instead of the catalog.
+            models.Index(
+                STOCK_MARGIN, 'id',
+                name='subvariant_stock_margin_idx',
+                condition=Q(reorder_level__gt=0),
+            ),
         ]
 
 class StockTransaction(models.Model):
@@ -66,5 +84,74 @@ class StockTransaction(models.Model):
     class Meta:
         db_table = "products_stock_transaction"
         indexes = [
-            models.Index(fields=['sub_variant', 'CreatedDate'])
-        ]
\ No newline at end of file
+            models.Index(fields=['sub_variant', 'CreatedDate']),
+            models.Index(fields=['CreatedDate']),
+        ]
+
+class Sequence(models.Model):
+    
+    name = models.CharField(max_length=100, primary_key=True)
+    value = models.BigIntegerField()
+
+    class Meta:
+        db_table = "products_sequence"
+
+
+class StockDailyRollup(models.Model):
+    
+    product = models.ForeignKey(Products, related_name='stock_rollups', on_delete=models.CASCADE)
+    sub_variant = models.ForeignKey(SubVariant, related_name='stock_rollups', on_delete=models.CASCADE)
+    day = models.DateField()
+    transaction_type = models.CharField(max_length=20, choices=[('IN', 'Stock In'), ('OUT', 'Stock Out')])
+    quantity = models.DecimalField(default=0, max_digits=20, decimal_places=8)
+    transaction_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "products_stock_daily_rollup"
+        constraints = [
+            models.UniqueConstraint(fields=['sub_variant', 'day', 'transaction_type'], name='unique_stock_rollup_bucket'),
+        ]
+        indexes = [
+            models.Index(fields=['product', 'day']),
+            models.Index(fields=['day']),
+        ]
+
+
+class StockSnapshot(models.Model):
+    
+    sub_variant = models.ForeignKey(SubVariant, related_name='snapshots', on_delete=models.CASCADE)
+    taken_at = models.DateTimeField()
+    stock = models.DecimalField(max_digits=20, decimal_places=8)
+
+    class Meta:
+        db_table = "products_stock_snapshot"
+        constraints = [
+            models.UniqueConstraint(fields=['sub_variant', 'taken_at'], name='unique_stock_snapshot'),
+        ]
+        indexes = [
+            models.Index(fields=['taken_at']),
+        ]
+
+
+class StockAlert(models.Model):
+    
+    sub_variant = models.ForeignKey(SubVariant, related_name='stock_alerts', on_delete=models.CASCADE)
+    alert_type = models.CharField(max_length=20, choices=[('LOW', 'Fell to reorder level'), ('CLEARED', 'Restocked above reorder level')])
+    stock = models.DecimalField(max_digits=20, decimal_places=8)
+    reorder_level = models.DecimalField(max_digits=20, decimal_places=8)
+    CreatedDate = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "products_stock_alert"
+        indexes = [
+            models.Index(fields=['CreatedDate']),
+        ]
+
+
+class ReconcileCheckpoint(models.Model):
+    
+    name = models.CharField(max_length=100, primary_key=True)
+    checked_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "products_reconcile_checkpoint"
@@ -1,9 +1,10 @@
 from rest_framework import serializers
-from .models import Products, Variant, SubVariant, StockTransaction
+from versatileimagefield.serializers import VersatileImageFieldSerializer
+from .models import Products, Variant, SubVariant, StockTransaction, StockAlert
 from src.Usermgmt.models import CustomUser
 import uuid
 from decimal import Decimal
-from django.utils import timezone
+from src.utils.stock import apply_stock_movement, apply_stock_movements, set_reorder_level
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,7 +13,7 @@ logger = logging.getLogger(__name__)
 class SubVariantSerializer(serializers.ModelSerializer):
     class Meta:
         model = SubVariant
-        fields = ['id', 'value', 'stock']
+        fields = ['id', 'value', 'stock', 'reorder_level']
 
 class VariantSerializer(serializers.ModelSerializer):
     options = SubVariantSerializer(many=True)
@@ -39,25 +40,57 @@ class StockGetTransactionSerializer(serializers.ModelSerializer):
             'option_value',
         ]
 
+class LowStockSerializer(serializers.ModelSerializer):
+    shortfall = serializers.SerializerMethodField()
+    variant_name = serializers.CharField(source="variant.name", read_only=True)
+    product_name = serializers.CharField(source="variant.product.ProductName", read_only=True)
+    product_code = serializers.CharField(source="variant.product.ProductCode", read_only=True)
+
+    class Meta:
+        model = SubVariant
+        fields = ['id', 'sku', 'value', 'stock', 'reorder_level', 'shortfall', 'variant_name', 'product_name', 'product_code']
+
+    def get_shortfall(self, obj):
+        return obj.reorder_level - obj.stock
+
+
+class StockAlertSerializer(serializers.ModelSerializer):
+    sku = serializers.CharField(source="sub_variant.sku", read_only=True)
+    option_value = serializers.CharField(source="sub_variant.value", read_only=True)
+    product_name = serializers.CharField(source="sub_variant.variant.product.ProductName", read_only=True)
+
+    class Meta:
+        model = StockAlert
+        fields = ['id', 'alert_type', 'stock', 'reorder_level', 'CreatedDate', 'sku', 'option_value', 'product_name']
+
+
 class ProductSerializer(serializers.ModelSerializer):
     variants = VariantSerializer(many=True, required=False)
+    ProductImageRenditions = VersatileImageFieldSerializer(source='ProductImage', sizes='product_image', read_only=True)
 
     class Meta:
         model = Products
         fields = [
             'id', 'ProductID', 'ProductCode',
             'ProductName', 'HSNCode', 'IsFavourite',
-            'TotalStock', 'ProductImage',
+            'TotalStock', 'ProductImage', 'ProductImageRenditions',
             'CreatedDate', 'UpdatedDate',
             'CreatedUser', 'variants'
         ]
         read_only_fields = ['CreatedDate', 'TotalStock']
 
+    def __init__(self, *args, fields=None, **kwargs):
+        
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
     def create(self, validated_data):
         
         variants_data = validated_data.pop('variants', [])
         
-        total_stock = 0
+        total_stock = Decimal('0')
 
         product = Products.objects.create(**validated_data)
 
@@ -68,25 +101,24 @@ class ProductSerializer(serializers.ModelSerializer):
             for option_data in options_data:
                 sku = option_data.get("sku") or f"SKU-{uuid.uuid4().hex[:8]}"
                 option_data["sku"] = sku
-                stock = option_data.get('stock', 0)
-                total_stock += float(stock)
+                total_stock += Decimal(option_data.get('stock', 0))
                 SubVariant.objects.create(variant=variant, **option_data)
 
         product.TotalStock = total_stock
         product.save(update_fields=["TotalStock"])
-        logger.info(f"Set total stock for {product.ProductCode}: {total_stock}")
+        logger.info("Set total stock for %s: %s", product.ProductCode, total_stock)
 
         return product
 
 
 class StockTransactionSerializer(serializers.Serializer):
     sub_variant_id = serializers.UUIDField(required=True)
-    quantity = serializers.DecimalField(max_digits=10, decimal_places=2, required=True)
+    quantity = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'), required=True)
 
     def validate_sub_variant_id(self, value):
         
         try:
-            return SubVariant.objects.get(id=value)
+            return SubVariant.objects.select_related('variant').only('id', 'sku', 'stock', 'variant__product').get(id=value)
         except SubVariant.DoesNotExist:
             raise serializers.ValidationError("Sub-variant not found")
 
@@ -96,6 +128,7 @@ class StockTransactionSerializer(serializers.Serializer):
         quantity = data['quantity']
         transaction_type = self.context.get('transaction_type')
 
+        # Early rejection only; apply_stock_movement re-checks atomically.
         if transaction_type == 'OUT' and sub_variant.stock < quantity:
             raise serializers.ValidationError("Insufficient stock")
 
@@ -108,26 +141,57 @@ class StockTransactionSerializer(serializers.Serializer):
         transaction_type = self.context['transaction_type']
         user = self.context['request'].user
 
-        if transaction_type == 'IN':
-            sub_variant.stock += quantity
-            product_total_stock = sub_variant.variant.product.TotalStock + quantity
-        else:  
-            sub_variant.stock -= quantity
-            product_total_stock = sub_variant.variant.product.TotalStock - quantity
-
-        sub_variant.save()
-
-        transaction = StockTransaction.objects.create(
-            sub_variant=sub_variant,
-            quantity=quantity,
-            transaction_type=transaction_type,
-            created_by=user,
-        )
-
-        product = sub_variant.variant.product
-        product.TotalStock = product_total_stock
-        product.UpdatedDate = timezone.now()
-        product.save()
-
-        logger.info(f"Stock {transaction_type}: {quantity} for {sub_variant.sku})")
-        return transaction
\ No newline at end of file
+        transaction = apply_stock_movement(sub_variant, quantity, transaction_type, user)
+
+        logger.info("Stock %s: %s for %s", transaction_type, quantity, sub_variant.sku)
+        return transaction
+
+
+class ReorderLevelSerializer(serializers.Serializer):
+    sub_variant_id = serializers.UUIDField(required=True)
+    reorder_level = serializers.DecimalField(max_digits=20, decimal_places=8, min_value=Decimal('0'), required=True)
+
+    def create(self, validated_data):
+
+        stock, alert = set_reorder_level(validated_data['sub_variant_id'], validated_data['reorder_level'])
+        logger.info("Reorder level of %s set to %s", validated_data['sub_variant_id'], validated_data['reorder_level'])
+        return {
+            'sub_variant_id': validated_data['sub_variant_id'],
+            'stock': stock,
+            'reorder_level': validated_data['reorder_level'],
+            'alert': alert.alert_type if alert is not None else None,
+        }
+
+
+class StockMovementSerializer(serializers.Serializer):
+    sub_variant_id = serializers.UUIDField(required=True)
+    quantity = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'), required=True)
+    transaction_type = serializers.ChoiceField(choices=['IN', 'OUT'])
+
+
+class BulkStockTransactionSerializer(serializers.Serializer):
+    movements = serializers.ListField(child=serializers.DictField(), allow_empty=False, max_length=1000)
+
+    def create(self, validated_data):
+        
+        # Items are validated one by one so a bad entry fails alone instead of the whole batch.
+        results = [None] * len(validated_data['movements'])
+        valid_indexes = []
+        valid_movements = []
+
+        for index, item in enumerate(validated_data['movements']):
+            movement = StockMovementSerializer(data=item)
+            if movement.is_valid():
+                valid_indexes.append(index)
+                valid_movements.append(movement.validated_data)
+            else:
+                results[index] = {'index': index, 'status': 'error', 'error': movement.errors}
+
+        user = self.context['request'].user
+        for result in apply_stock_movements(valid_movements, user):
+            index = valid_indexes[result['index']]
+            results[index] = {**result, 'index': index}
+
+        applied = sum(1 for result in results if result['status'] == 'ok')
+        logger.info("Bulk stock: %d applied, %d failed", applied, len(results) - applied)
+        return results
@@ -0,0 +1,61 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from src.utils.cache import bump_catalog_version
+from src.utils.metrics import install_query_timer
+from src.utils.search import remove_products, schedule_index
+from src.utils.sku_lookup import sku_cache
+from .models import Products, Variant, SubVariant
+
+
+@receiver([post_save, post_delete], sender=Products)
+@receiver([post_save, post_delete], sender=Variant)
+@receiver([post_save, post_delete], sender=SubVariant)
+def catalog_changed(sender, **kwargs):
+    
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=Products)
+def product_saved(sender, instance, **kwargs):
+    
+    schedule_index(instance.id)
+
+
+@receiver(post_delete, sender=Products)
+def product_deleted(sender, instance, **kwargs):
+    
+    remove_products([instance.id])
+
+
+@receiver([post_save, post_delete], sender=SubVariant)
+def sub_variant_changed(sender, instance, **kwargs):
+    
+    if SubVariant.variant.is_cached(instance):
+        product_id = instance.variant.product_id
+    else:
+        product_id = Variant.objects.filter(id=instance.variant_id).values_list('product_id', flat=True).first()
+    if product_id:
+        schedule_index(product_id)
+
+
+@receiver([post_save, post_delete], sender=SubVariant)
+def sub_variant_sku_changed(sender, instance, **kwargs):
+    
+    sku_cache.delete(instance.sku)
+
+
+@receiver([post_save, post_delete], sender=Products)
+@receiver([post_save, post_delete], sender=Variant)
+def product_identity_changed(sender, created=False, **kwargs):
+    
+    # New rows cannot be cached yet; renames and deletes are rare, so drop everything.
+    if not created:
+        sku_cache.clear()
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    
+    install_query_timer(connection)
@@ -1,3 +1,1216 @@
-from django.test import TestCase
+import base64
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock
+from decimal import Decimal
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import OperationalError, connection, connections
+from django.db.models import Sum
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from src.constant.Logging import AsyncQueueHandler, JsonFormatter, SamplingFilter, parse_sample_rates
+from src.constant.Pagination import LowStockCursorPagination
+from src.Usermgmt.authentication import user_cache
+from src.Usermgmt.models import CustomUser
+from src.utils.cache import LRUCache, bump_catalog_version, catalog_version, product_list_cache
+from src.utils.db_routing import PIN_COOKIE, replica_reads
+from src.utils.image_renditions import renditions
+from src.utils.metrics import registry
+from src.utils.image_utils import ImageTooLarge, decode_base64_image
+from src.utils.search import rebuild_index
+from src.utils.sequence import SequenceAllocator
+from src.utils.sku_lookup import sku_cache
+from src.utils.stock import apply_stock_movement
+from src.utils.stock_rollup import rebuild_rollups
+from src.utils.stock_alerts import low_stock_queryset
+from src.utils.stock_reconcile import find_drift, load_checkpoint, reconcile_total_stock
+from src.utils.stock_snapshot import compact_snapshots, stock_as_of, take_snapshot
+from .serializers import ProductSerializer, StockGetTransactionSerializer
+from .models import Products, Variant, SubVariant, StockAlert, StockTransaction, StockDailyRollup, StockSnapshot, ReconcileCheckpoint, Sequence
+
+
+def create_product(user, product_id, variants=1, options=1, stock=Decimal('10')):
+
+    product = Products.objects.create(
+        ProductID=product_id,
+        ProductCode=f'PROD-{product_id}',
+        ProductName=f'Product {product_id}',
+        CreatedUser=user,
+        TotalStock=stock * variants * options,
+    )
+    for v in range(variants):
+        variant = Variant.objects.create(product=product, name=f'Variant {v}')
+        for o in range(options):
+            SubVariant.objects.create(
+                variant=variant,
+                value=f'Option {o}',
+                stock=stock,
+                sku=f'SKU-{product_id}-{v}-{o}',
+            )
+    return product
+
+
+class ProductListQueryTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+
+    def list_products(self):
+        return self.client.get(reverse('product_list'))
+
+    def test_query_count_is_constant(self):
+        create_product(self.user, 1000, variants=1, options=1)
+        with self.assertNumQueries(3):
+            response = self.list_products()
+        self.assertEqual(len(response.data['results']), 1)
+
+        for product_id in range(1001, 1020):
+            create_product(self.user, product_id, variants=4, options=3)
+        with self.assertNumQueries(3):
+            response = self.list_products()
+        self.assertEqual(len(response.data['results']), 12)
+        self.assertEqual(len(response.data['results'][0]['variants']), 4)
+        self.assertEqual(len(response.data['results'][0]['variants'][0]['options']), 3)
+
+    def test_variants_and_options_are_ordered(self):
+        create_product(self.user, 1000, variants=3, options=2)
+        product = self.list_products().data['results'][0]
+        self.assertEqual([v['name'] for v in product['variants']], ['Variant 0', 'Variant 1', 'Variant 2'])
+        self.assertEqual([o['value'] for o in product['variants'][0]['options']], ['Option 0', 'Option 1'])
+
+    def test_sparse_fields_skip_prefetch_and_unused_columns(self):
+        for product_id in range(1000, 1003):
+            create_product(self.user, product_id, variants=2, options=2)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('product_list'), {'fields': 'ProductName,TotalStock'})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('ProductImage', queries[0]['sql'])
+        self.assertEqual(set(response.data['results'][0]), {'id', 'ProductName', 'TotalStock'})
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('product_list'), {'fields': 'ProductName', 'include': 'variants'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'ProductName', 'variants'})
+        self.assertEqual(len(response.data['results'][0]['variants']), 2)
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(reverse('product_list'), {'fields': 'ProductName,Secret'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Secret', response.data['error'])
+        response = self.client.get(reverse('product_list'), {'include': 'owner'})
+        self.assertEqual(response.status_code, 400)
+
+
+class StockReportQueryTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+
+    def test_report_page_is_a_single_joined_query(self):
+        for product_id in range(1000, 1004):
+            product = create_product(self.user, product_id, variants=2, options=2)
+            for option in SubVariant.objects.filter(variant__product=product):
+                StockTransaction.objects.create(
+                    sub_variant=option, quantity=Decimal('1'), transaction_type='IN', created_by=self.user,
+                )
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('stock_transaction_list'))
+        row = response.data['results'][0]
+        self.assertEqual(row['product_name'], 'Product 1003')
+        self.assertIn(row['variant_name'], ['Variant 0', 'Variant 1'])
+        self.assertIn(row['option_value'], ['Option 0', 'Option 1'])
+
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+        self.product = create_product(self.user, 1000, variants=2, options=2)
+        self.option = SubVariant.objects.filter(variant__product=self.product).first()
+        apply_stock_movement(self.option, Decimal('1'), 'IN', self.user)
+
+    def test_unchanged_product_list_is_not_modified(self):
+        first = self.client.get(reverse('product_list'))
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+
+        with mock.patch.object(ProductSerializer, 'to_representation') as to_representation:
+            with self.assertNumQueries(0):
+                response = self.client.get(reverse('product_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        to_representation.assert_not_called()
+
+        other_page = self.client.get(reverse('product_list'), {'fields': 'ProductName'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(other_page.status_code, 200)
+
+        apply_stock_movement(self.option, Decimal('1'), 'IN', self.user)
+        response = self.client.get(reverse('product_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_unchanged_stock_report_is_not_modified(self):
+        first = self.client.get(reverse('stock_transaction_list'))
+        etag = first['ETag']
+        self.assertNotIn('Last-Modified', first)
+
+        with mock.patch.object(StockGetTransactionSerializer, 'to_representation') as to_representation:
+            with self.assertNumQueries(0):
+                response = self.client.get(reverse('stock_transaction_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        to_representation.assert_not_called()
+
+        apply_stock_movement(self.option, Decimal('2'), 'OUT', self.user)
+        response = self.client.get(reverse('stock_transaction_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['transaction_type'], 'OUT')
+
+    def test_writes_between_if_modified_since_polls_are_not_hidden(self):
+        since = http_date()
+        self.client.get(reverse('stock_transaction_list'), HTTP_IF_MODIFIED_SINCE=since)
+        apply_stock_movement(self.option, Decimal('2'), 'OUT', self.user)
+        response = self.client.get(reverse('stock_transaction_list'), HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['transaction_type'], 'OUT')
+
+        self.product.ProductName = 'Renamed'
+        self.product.save()
+        response = self.client.get(reverse('stock_transaction_list'), HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['product_name'], 'Renamed')
+
+
+class StockMutationTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+        self.client.force_authenticate(self.user)
+        self.product = create_product(self.user, 1000, stock=Decimal('5'))
+        self.option = SubVariant.objects.get(variant__product=self.product)
+
+    def move(self, name, quantity):
+        return self.client.post(reverse(name), {'sub_variant_id': str(self.option.id), 'quantity': quantity})
+
+    def test_add_and_remove_update_balances_and_ledger(self):
+        self.assertEqual(self.move('add_stock', '3').status_code, 200)
+        self.assertEqual(self.move('remove_stock', '6').status_code, 200)
+        self.option.refresh_from_db()
+        self.product.refresh_from_db()
+        self.assertEqual(self.option.stock, Decimal('2'))
+        self.assertEqual(self.product.TotalStock, Decimal('2'))
+        self.assertIsNotNone(self.product.UpdatedDate)
+        self.assertEqual(StockTransaction.objects.filter(sub_variant=self.option).count(), 2)
+
+    def test_remove_more_than_available_is_rejected(self):
+        response = self.move('remove_stock', '6')
+        self.assertEqual(response.status_code, 400)
+        self.option.refresh_from_db()
+        self.assertEqual(self.option.stock, Decimal('5'))
+        self.assertFalse(StockTransaction.objects.exists())
+
+    def test_zero_and_negative_quantities_are_rejected(self):
+        for name in ('add_stock', 'remove_stock'):
+            for quantity in ('-50', '0'):
+                self.assertEqual(self.move(name, quantity).status_code, 400)
+        with self.assertRaises(ValidationError):
+            apply_stock_movement(self.option, Decimal('-50'), 'OUT', self.user)
+        self.option.refresh_from_db()
+        self.assertEqual(self.option.stock, Decimal('5'))
+        self.assertFalse(StockTransaction.objects.exists())
+        self.assertFalse(StockDailyRollup.objects.exists())
+
+
+class ConcurrentStockMutationTests(TransactionTestCase):
+
+    workers = 8
+    calls_per_worker = 250
+
+    def test_concurrent_moves_match_the_ledger(self):
+        user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+        product = create_product(user, 1000, options=2, stock=Decimal('20'))
+        options = list(SubVariant.objects.filter(variant__product=product).order_by('value'))
+
+        errors = []
+
+        def worker(seed):
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                for i in range(self.calls_per_worker):
+                    option = options[(seed + i) % len(options)]
+                    name = 'add_stock' if (seed + i) % 2 else 'remove_stock'
+                    response = client.post(reverse(name), {'sub_variant_id': str(option.id), 'quantity': '3'})
+                    if response.status_code != 200 and 'Insufficient stock' not in str(response.data):
+                        errors.append(response.data)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+        total = Decimal('0')
+        for option in options:
+            option.refresh_from_db()
+            moved = StockTransaction.objects.filter(sub_variant=option).values('transaction_type').annotate(total=Sum('quantity'))
+            moved = {row['transaction_type']: row['total'] for row in moved}
+            expected = Decimal('20') + moved.get('IN', 0) - moved.get('OUT', 0)
+            self.assertEqual(option.stock, expected)
+            self.assertGreaterEqual(option.stock, 0)
+            total += option.stock
+
+        product.refresh_from_db()
+        self.assertEqual(product.TotalStock, total)
+        self.assertEqual(StockTransaction.objects.filter(transaction_type='IN').count(), self.workers * self.calls_per_worker // 2)
+
+
+class ReadReplicaRoutingTests(TransactionTestCase):
+
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        product_list_cache.clear()
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+        self.product = create_product(self.user, 1000)
+        self.option = SubVariant.objects.get(variant__product=self.product)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_with_queries(self, name):
+        with CaptureQueriesContext(connections['default']) as primary:
+            with CaptureQueriesContext(connections['replica']) as replica:
+                response = self.client.get(reverse(name))
+        self.assertEqual(response.status_code, 200)
+        return len(primary), len(replica)
+
+    def test_reads_use_the_replica_until_the_client_writes(self):
+        primary, replica = self.get_with_queries('stock_transaction_list')
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+        response = self.client.post(reverse('add_stock'), {'sub_variant_id': str(self.option.id), 'quantity': '2'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        primary, replica = self.get_with_queries('stock_transaction_list')
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_writes_inside_a_replica_block_pin_later_reads(self):
+        with replica_reads() as state:
+            self.assertEqual(SubVariant.objects.filter(id=self.option.id).db, 'replica')
+            self.option.stock = Decimal('3')
+            self.option.save(update_fields=['stock'])
+            self.assertTrue(state.wrote)
+            self.assertEqual(SubVariant.objects.filter(id=self.option.id).db, 'default')
+
+    def test_replica_connection_is_read_only(self):
+        with self.assertRaises(OperationalError):
+            with connections['replica'].cursor() as cursor:
+                cursor.execute("DELETE FROM products_stock_transaction")
+
+
+class BulkStockTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+        self.client.force_authenticate(self.user)
+        self.product = create_product(self.user, 1000, options=2, stock=Decimal('5'))
+        self.first, self.second = SubVariant.objects.filter(variant__product=self.product).order_by('value')
+
+    def test_batch_applies_valid_items_and_reports_failures(self):
+        movements = [
+            {'sub_variant_id': str(self.first.id), 'quantity': '4', 'transaction_type': 'OUT'},
+            {'sub_variant_id': str(self.first.id), 'quantity': '2', 'transaction_type': 'OUT'},
+            {'sub_variant_id': str(self.second.id), 'quantity': '10', 'transaction_type': 'IN'},
+            {'sub_variant_id': '00000000-0000-0000-0000-000000000000', 'quantity': '1', 'transaction_type': 'IN'},
+            {'sub_variant_id': str(self.second.id), 'quantity': '-1', 'transaction_type': 'IN'},
+        ]
+        response = self.client.post(reverse('bulk_stock'), {'movements': movements}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['applied'], 2)
+        self.assertEqual([r['status'] for r in response.data['results']], ['ok', 'error', 'ok', 'error', 'error'])
+        self.assertEqual(response.data['results'][1]['error'], 'Insufficient stock')
+
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.product.refresh_from_db()
+        self.assertEqual(self.first.stock, Decimal('1'))
+        self.assertEqual(self.second.stock, Decimal('15'))
+        self.assertEqual(self.product.TotalStock, Decimal('16'))
+        self.assertEqual(StockTransaction.objects.count(), 2)
+
+    def test_batch_writes_are_aggregated(self):
+        movements = [
+            {'sub_variant_id': str(option.id), 'quantity': '1', 'transaction_type': 'IN'}
+            for option in (self.first, self.second) for _ in range(20)
+        ]
+        # savepoint, lookup, bulk insert, one update per option (2) and product (1),
+        # a rollup bucket per option (update miss, savepoint, insert, release), release
+        with self.assertNumQueries(15):
+            response = self.client.post(reverse('bulk_stock'), {'movements': movements}, format='json')
+        self.assertEqual(response.data['applied'], 40)
+
+
+class ProductImportTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+        self.client.force_authenticate(self.user)
+
+    def upload(self, name, content):
+        return self.client.post(reverse('product_import'), {'file': SimpleUploadedFile(name, content.encode())}, format='multipart')
+
+    def test_csv_import_groups_rows_into_products(self):
+        create_product(self.user, 1000)
+        content = (
+            "ProductName,HSNCode,variant,option,stock,sku\n"
+            "Shirt,6105,Size,S,5,SH-S\n"
+            "Shirt,6105,Size,M,2.5,SH-M\n"
+            "Shirt,6105,Colour,Red,1,SH-R\n"
+            "Mug,6912,Colour,Blue,4,MUG-B\n"
+        )
+        response = self.upload('catalog.csv', content)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['products'], 2)
+        self.assertEqual(response.data['options'], 4)
+        shirt = Products.objects.get(ProductName='Shirt')
+        self.assertEqual(shirt.TotalStock, Decimal('8.5'))
+        self.assertEqual(shirt.ProductCode, f'PROD-{shirt.ProductID}')
+        self.assertEqual(shirt.variants.count(), 2)
+        self.assertEqual(Products.objects.get(ProductName='Mug').ProductID, shirt.ProductID + 1)
+
+    def test_jsonl_import_reports_rejected_lines(self):
+        create_product(self.user, 1000)
+        lines = [
+            {'ProductName': 'Lamp', 'variants': [{'name': 'Colour', 'options': [{'value': 'White', 'stock': 3}]}]},
+            {'ProductName': '', 'variants': []},
+            {'ProductName': 'Clash', 'variants': [{'name': 'Size', 'options': [{'value': 'S', 'sku': 'SKU-1000-0-0'}]}]},
+        ]
+        content = '\n'.join(json.dumps(line) for line in lines) + '\n{not json\n'
+        response = self.upload('catalog.jsonl', content)
+
+        self.assertEqual(response.data['products'], 1)
+        self.assertEqual(response.data['rejected_count'], 3)
+        self.assertEqual(sorted(r['line'] for r in response.data['rejected']), [2, 3, 4])
+        self.assertTrue(Products.objects.filter(ProductName='Lamp').exists())
+
+    def test_malformed_rows_are_rejected_without_aborting_the_import(self):
+        option = lambda **extra: {'ProductName': 'Bad', 'variants': [{'name': 'Size', 'options': [{'value': 'S', **extra}]}]}
+        lines = [
+            {'ProductName': 'Good', 'variants': [{'name': 'Size', 'options': [{'value': 'S', 'stock': '2'}]}]},
+            {'ProductName': 'Bad', 'variants': 'x'},
+            {'ProductName': 'Bad', 'variants': [1]},
+            {'ProductName': 'Bad', 'variants': [{'name': 'Size', 'options': 'x'}]},
+            {'ProductName': 7},
+            {'ProductName': 'Bad', 'variants': [{'name': ['Size']}]},
+            option(value=3),
+            option(sku={'a': 1}),
+            option(stock='NaN'),
+            option(stock='Infinity'),
+            option(stock='1e30'),
+            option(stock='0.000000001'),
+            {'ProductName': 'Dupes', 'variants': [{'name': 'Size', 'options': [
+                {'value': 'S', 'sku': 'DUP-A'}, {'value': 'M', 'sku': 'DUP-B'}, {'value': 'L', 'sku': 'DUP-B'},
+            ]}]},
+            {'ProductName': 'Last', 'variants': [{'name': 'Size', 'options': [{'value': 'S', 'stock': 1}]}]},
+        ]
+        response = self.upload('catalog.jsonl', '\n'.join(json.dumps(line) for line in lines))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['products'], 2)
+        self.assertEqual(response.data['rejected_count'], len(lines) - 2)
+        self.assertEqual(sorted(r['line'] for r in response.data['rejected']), list(range(2, len(lines))))
+        self.assertIn({'line': 13, 'error': 'Duplicate SKU: DUP-B'}, response.data['rejected'])
+        self.assertEqual(set(Products.objects.values_list('ProductName', flat=True)), {'Good', 'Last'})
+
+
+class ProductIdAllocationTests(TransactionTestCase):
+
+    def test_concurrent_allocations_are_unique(self):
+        allocators = [SequenceAllocator('test-ids', initial=lambda: 1000, block_size=7) for _ in range(4)]
+        allocated = []
+
+        def worker(allocator):
+            try:
+                allocated.extend(allocator.next() for _ in range(100))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(allocator,)) for allocator in allocators for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(allocated), 800)
+        self.assertEqual(len(set(allocated)), 800)
+        self.assertGreaterEqual(min(allocated), 1000)
+
+    def test_preview_never_repeats_a_code(self):
+        user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+        client = APIClient()
+        client.force_authenticate(user)
+        codes = [client.get(reverse('product-next-code')).data['ProductCode'] for _ in range(3)]
+        self.assertEqual(len(set(codes)), 3)
+
+
+class StockExportTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+        self.client.force_authenticate(self.user)
+        product = create_product(self.user, 1000)
+        option = SubVariant.objects.get(variant__product=product)
+        for quantity in ('1', '2', '3'):
+            StockTransaction.objects.create(
+                sub_variant=option, quantity=Decimal(quantity), transaction_type='IN', created_by=self.user,
+            )
+
+    def export(self, **params):
+        response = self.client.get(reverse('stock_export'), params)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv_export_streams_every_row(self):
+        response, body = self.export()
+        rows = list(csv.DictReader(io.StringIO(body.decode())))
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual([Decimal(row['quantity']) for row in rows], [1, 2, 3])
+        self.assertEqual(rows[0]['sku'], 'SKU-1000-0-0')
+        self.assertEqual(rows[0]['created_by'], 'owner@example.com')
+
+    def test_gzipped_jsonl_export(self):
+        response, body = self.export(file_format='jsonl', gzip='1')
+        lines = gzip.decompress(body).decode().splitlines()
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('stock-transactions.jsonl.gz', response['Content-Disposition'])
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])['product_name'], 'Product 1000')
+
+    def test_invalid_dates_are_rejected(self):
+        response = self.client.get(reverse('stock_export'), {'start_date': '18-10-2026'})
+        self.assertEqual(response.status_code, 400)
+
+
+class StockRollupTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+        self.client.force_authenticate(self.user)
+        self.product = create_product(self.user, 1000, options=2, stock=Decimal('50'))
+        self.first, self.second = SubVariant.objects.filter(variant__product=self.product).order_by('value')
+
+    def move(self, name, option, quantity):
+        return self.client.post(reverse(name), {'sub_variant_id': str(option.id), 'quantity': quantity})
+
+    def test_mutations_update_rollup_and_summary(self):
+        self.move('add_stock', self.first, '5')
+        self.move('add_stock', self.second, '2')
+        self.move('remove_stock', self.first, '3')
+        movements = [{'sub_variant_id': str(self.first.id), 'quantity': '1', 'transaction_type': 'OUT'}] * 2
+        self.client.post(reverse('bulk_stock'), {'movements': movements}, format='json')
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('stock_summary'), {'product': str(self.product.id)})
+        rows = {row['transaction_type']: row for row in response.data['results']}
+        self.assertEqual(rows['IN']['quantity'], Decimal('7'))
+        self.assertEqual(rows['IN']['transaction_count'], 2)
+        self.assertEqual(rows['OUT']['quantity'], Decimal('5'))
+        self.assertEqual(rows['OUT']['transaction_count'], 3)
+
+    def test_rebuild_matches_incremental_rollup(self):
+        self.move('add_stock', self.first, '5')
+        self.move('remove_stock', self.second, '4')
+        self.move('remove_stock', self.second, '1')
+        incremental = set(StockDailyRollup.objects.values_list('sub_variant_id', 'day', 'transaction_type', 'quantity', 'transaction_count'))
+
+        self.assertEqual(rebuild_rollups(), 2)
+        rebuilt = set(StockDailyRollup.objects.values_list('sub_variant_id', 'day', 'transaction_type', 'quantity', 'transaction_count'))
+        self.assertEqual(rebuilt, incremental)
+
+
+class StockSnapshotTests(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+        self.product = create_product(self.user, 1000, stock=Decimal('10'))
+        self.option = SubVariant.objects.select_related('variant').get(variant__product=self.product)
+
+    def move(self, transaction_type, quantity, days_ago):
+        transaction = apply_stock_movement(self.option, Decimal(quantity), transaction_type, self.user)
+        StockTransaction.objects.filter(pk=transaction.pk).update(CreatedDate=timezone.now() - timedelta(days=days_ago))
+
+    def test_as_of_uses_nearest_checkpoint(self):
+        self.move('IN', '5', days_ago=10)
+        StockSnapshot.objects.create(sub_variant=self.option, taken_at=timezone.now() - timedelta(days=9), stock=Decimal('15'))
+        self.move('OUT', '3', days_ago=8)
+        self.move('IN', '4', days_ago=2)
+        self.option.refresh_from_db()
+
+        at = timezone.now()
+        self.assertEqual(stock_as_of(self.option, at - timedelta(days=9, hours=12)), Decimal('15'))
+        self.assertEqual(stock_as_of(self.option, at - timedelta(days=7)), Decimal('12'))
+        self.assertEqual(stock_as_of(self.option, at - timedelta(days=1)), Decimal('16'))
+        self.assertEqual(stock_as_of(self.option, at - timedelta(days=11)), Decimal('10'))
+
+    def test_as_of_endpoint(self):
+        self.move('OUT', '4', days_ago=3)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        date = (timezone.now() - timedelta(days=5)).date().isoformat()
+        response = client.get(reverse('stock_as_of'), {'date': date, 'product': str(self.product.id)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['stock'], Decimal('10'))
+
+    def test_as_of_endpoint_rejects_malformed_ids(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        date = timezone.now().date().isoformat()
+        for param in ('product', 'sub_variant'):
+            response = client.get(reverse('stock_as_of'), {'date': date, param: 'not-a-uuid'})
+            self.assertEqual(response.status_code, 400)
+
+    def test_snapshot_is_stamped_under_the_write_lock(self):
+        stamped_in_transaction = []
+        real_now = timezone.now
+        depth = len(connection.atomic_blocks)
+
+        def now():
+            stamped_in_transaction.append(len(connection.atomic_blocks) > depth)
+            return real_now()
+
+        with mock.patch('src.utils.stock_snapshot.timezone.now', now):
+            take_snapshot()
+        self.assertEqual(stamped_in_transaction, [True])
+        self.assertEqual(StockSnapshot.objects.get(sub_variant=self.option).stock, Decimal('10'))
+
+    def test_compaction_thins_old_checkpoints(self):
+        now = timezone.now()
+        for days_ago in (1, 2, 40, 41, 42, 400, 410):
+            StockSnapshot.objects.create(sub_variant=self.option, taken_at=now - timedelta(days=days_ago), stock=Decimal('1'))
+
+        compact_snapshots(keep_days=30, weekly_days=365)
+        remaining = StockSnapshot.objects.count()
+        self.assertLess(remaining, 7)
+        self.assertGreaterEqual(remaining, 4)
+        self.assertEqual(StockSnapshot.objects.filter(taken_at__gte=now - timedelta(days=2, minutes=1)).count(), 2)
+
+
+class ProductListCacheTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+        self.product = create_product(self.user, 1000, stock=Decimal('5'))
+        self.option = SubVariant.objects.get(variant__product=self.product)
+        product_list_cache.clear()
+
+    def test_repeated_pages_are_served_from_cache(self):
+        self.client.get(reverse('product_list'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('product_list'))
+        self.assertEqual(response.data['results'][0]['ProductCode'], 'PROD-1000')
+        self.assertEqual(product_list_cache.stats()['hits'], 1)
+        self.assertEqual(product_list_cache.stats()['misses'], 1)
+
+    def test_stock_mutation_invalidates_cached_pages(self):
+        self.client.get(reverse('product_list'))
+        self.client.force_authenticate(self.user)
+        self.client.post(reverse('add_stock'), {'sub_variant_id': str(self.option.id), 'quantity': '2'})
+
+        response = self.client.get(reverse('product_list'))
+        self.assertEqual(Decimal(response.data['results'][0]['TotalStock']), Decimal('7'))
+        self.assertEqual(Decimal(response.data['results'][0]['variants'][0]['options'][0]['stock']), Decimal('7'))
+
+    def test_version_bumps_reach_other_workers(self):
+        # Two processes each build their own cache objects over the same shared store.
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        worker_a, worker_b = FileBasedCache(location, {}), FileBasedCache(location, {})
+
+        with mock.patch('src.utils.cache.caches', {'versions': worker_b}):
+            seen_by_b = catalog_version()
+        with mock.patch('src.utils.cache.caches', {'versions': worker_a}):
+            self.assertEqual(catalog_version(), seen_by_b)
+            bump_catalog_version()
+        with mock.patch('src.utils.cache.caches', {'versions': worker_b}):
+            self.assertNotEqual(catalog_version(), seen_by_b)
+
+    def test_per_process_version_store_is_refused(self):
+        with mock.patch('src.utils.cache.caches', {'versions': LocMemCache('versions', {})}):
+            with self.assertRaises(ImproperlyConfigured):
+                catalog_version()
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+
+def png_bytes(size=(640, 480)):
+
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 30, 30)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class ImageRenditionTests(TransactionTestCase):
+
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        override = self.settings(MEDIA_ROOT=self.media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+
+    def test_registration_queues_renditions_off_the_request(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        image = 'data:image/png;base64,' + base64.b64encode(png_bytes()).decode()
+        response = client.post(reverse('product_register'), {
+            'ProductID': 5000, 'ProductCode': 'PROD-5000', 'ProductName': 'Poster', 'ProductImage': image,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        product_id = response.data['id']
+
+        deadline = time.monotonic() + 10
+        while (renditions.status(uuid.UUID(product_id)) or {}).get('status') != 'done' and time.monotonic() < deadline:
+            time.sleep(0.05)
+        job = client.get(reverse('product_rendition_status', args=[product_id])).data
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual(job['created'], 3)
+
+        sized = os.path.join(self.media.name, '__sized__')
+        self.assertEqual(sum(len(files) for _, _, files in os.walk(sized)), 2)
+
+    def test_list_does_not_render_images(self):
+        product = create_product(self.user, 1000)
+        product.ProductImage = SimpleUploadedFile('poster.png', png_bytes())
+        product.save()
+
+        response = APIClient().get(reverse('product_list'))
+        self.assertIn('thumbnail', response.data['results'][0]['ProductImageRenditions'])
+        self.assertFalse(os.path.exists(os.path.join(self.media.name, '__sized__')))
+
+
+class ProductImageIngestionTests(TransactionTestCase):
+
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        override = self.settings(MEDIA_ROOT=self.media.name, PRODUCT_IMAGE_MAX_BYTES=64 * 1024, PRODUCT_IMAGE_SPOOL_BYTES=1024)
+        override.enable()
+        self.addCleanup(override.disable)
+        submit = mock.patch.object(renditions, 'submit')
+        submit.start()
+        self.addCleanup(submit.stop)
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def register(self, image, format='json', **extra):
+        data = {'ProductID': 5000, 'ProductCode': 'PROD-5000', 'ProductName': 'Poster', 'ProductImage': image, **extra}
+        return self.client.post(reverse('product_register'), data, format=format)
+
+    def test_base64_image_is_decoded_with_its_real_size(self):
+        content = png_bytes()
+        upload = decode_base64_image('data:image/png;base64,' + base64.b64encode(content).decode())
+        self.assertEqual(upload.size, len(content))
+        self.assertEqual(upload.read(), content)
+        self.assertEqual(upload.content_type, 'image/png')
+
+    def test_non_image_payload_is_rejected(self):
+        response = self.register('data:image/png;base64,' + base64.b64encode(b'not an image at all').decode())
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Products.objects.exists())
+
+    def test_oversized_base64_is_rejected_before_decoding(self):
+        payload = 'data:image/png;base64,' + 'A' * (200 * 1024)
+        with self.assertRaises(ImageTooLarge):
+            decode_base64_image(payload)
+        self.assertEqual(self.register(payload).status_code, 413)
+
+    def test_multipart_upload(self):
+        image = SimpleUploadedFile('poster.png', png_bytes(), content_type='image/png')
+        variants = json.dumps([{'name': 'Size', 'options': [{'value': 'A2', 'stock': '3', 'sku': 'POSTER-A2'}]}])
+        response = self.register(image, format='multipart', variants=variants)
+        self.assertEqual(response.status_code, 201)
+        product = Products.objects.get(ProductID=5000)
+        self.assertTrue(product.ProductImage.name.endswith('.png'))
+        self.assertEqual(product.TotalStock, Decimal('3'))
+
+    def test_multipart_upload_over_the_limit_is_aborted(self):
+        noise = Image.frombytes('RGB', (256, 256), os.urandom(256 * 256 * 3))
+        buffer = io.BytesIO()
+        noise.save(buffer, format='PNG')
+        response = self.register(SimpleUploadedFile('noise.png', buffer.getvalue()), format='multipart')
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(Products.objects.exists())
+
+
+class ProductSearchTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+
+    def search(self, query, **params):
+        return self.client.get(reverse('product_search'), {'q': query, **params})
+
+    def test_prefix_search_over_name_code_hsn_and_sku(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            shirt = create_product(self.user, 1000)
+            shirt.ProductName = 'Linen Shirt'
+            shirt.HSNCode = '6105'
+            shirt.save()
+            create_product(self.user, 1001)
+
+        self.assertEqual([r['ProductCode'] for r in self.search('lin').data['results']], ['PROD-1000'])
+        self.assertEqual([r['ProductCode'] for r in self.search('610').data['results']], ['PROD-1000'])
+        self.assertEqual([r['ProductCode'] for r in self.search('SKU-1001').data['results']], ['PROD-1001'])
+        self.assertEqual(self.search('prod 1001').data['results'][0]['ProductCode'], 'PROD-1001')
+        self.assertEqual(self.search('"OR* (').data['results'], [])
+
+    def test_fields_narrow_search_results(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_product(self.user, 1000)
+        result = self.search('product', fields='ProductCode').data['results'][0]
+        self.assertEqual(set(result), {'id', 'ProductCode', 'score'})
+        self.assertEqual(self.search('product', fields='CreatedUser').status_code, 400)
+
+    def test_deactivated_products_leave_the_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            product = create_product(self.user, 1000)
+        with self.captureOnCommitCallbacks(execute=True):
+            product.Active = False
+            product.save()
+        self.assertEqual(self.search('product').data['results'], [])
+
+    def test_cursor_paging_and_rebuild(self):
+        for product_id in range(1000, 1015):
+            create_product(self.user, product_id)
+        self.assertEqual(rebuild_index(), 15)
+
+        first = self.search('product')
+        self.assertEqual(len(first.data['results']), 12)
+        second = self.client.get(first.data['next'])
+        self.assertEqual(len(second.data['results']), 3)
+        self.assertIsNone(second.data['next'])
+        codes = {r['ProductCode'] for r in first.data['results'] + second.data['results']}
+        self.assertEqual(len(codes), 15)
+
+    def test_best_match_wins_wherever_it_was_indexed(self):
+        for product_id in range(1000, 1030):
+            product = create_product(self.user, product_id)
+            product.HSNCode = 'widget'
+            product.ProductName = 'Widget' if product_id == 1029 else product.ProductName
+            product.save()
+        rebuild_index()
+
+        results = self.search('widget').data['results']
+        self.assertEqual(results[0]['ProductCode'], 'PROD-1029')
+        self.assertEqual(len(results), 12)
+
+
+class SkuScanTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+        self.client.force_authenticate(self.user)
+        self.product = create_product(self.user, 1000, options=2, stock=Decimal('5'))
+        sku_cache.clear()
+
+    def test_hot_sku_costs_one_query_and_reads_fresh_stock(self):
+        first = self.client.get(reverse('sku_scan', args=['SKU-1000-0-0']))
+        self.assertEqual(first.data['ProductCode'], 'PROD-1000')
+        self.assertEqual(first.data['stock'], Decimal('5'))
+
+        self.client.post(reverse('add_stock'), {'sub_variant_id': str(first.data['sub_variant_id']), 'quantity': '2'})
+        with self.assertNumQueries(1):
+            again = self.client.get(reverse('sku_scan', args=['SKU-1000-0-0']))
+        self.assertEqual(again.data['stock'], Decimal('7'))
+
+    def test_multi_sku_lookup(self):
+        with self.assertNumQueries(1):
+            response = self.client.post(reverse('sku_scan_many'), {'skus': ['SKU-1000-0-1', 'NOPE', 'SKU-1000-0-0']}, format='json')
+        self.assertEqual([r['sku'] for r in response.data['results']], ['SKU-1000-0-1', 'SKU-1000-0-0'])
+        self.assertEqual(response.data['missing'], ['NOPE'])
+
+    def test_renamed_sku_is_not_served_from_cache(self):
+        self.client.get(reverse('sku_scan', args=['SKU-1000-0-0']))
+        SubVariant.objects.filter(sku='SKU-1000-0-0').update(sku='SKU-RENAMED')
+        self.assertEqual(self.client.get(reverse('sku_scan', args=['SKU-1000-0-0'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('sku_scan', args=['SKU-RENAMED'])).status_code, 200)
+
+
+class LowStockTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+        self.client.force_authenticate(self.user)
+        product = create_product(self.user, 1000, variants=1, options=4, stock=Decimal('10'))
+        self.options = list(SubVariant.objects.filter(variant__product=product).order_by('value'))
+        levels = [Decimal('5'), Decimal('12'), Decimal('30'), Decimal('0')]
+        for option, level in zip(self.options, levels):
+            option.reorder_level = level
+            option.save(update_fields=['reorder_level'])
+
+    def move(self, option, quantity, name='remove_stock'):
+        return self.client.post(reverse(name), {'sub_variant_id': str(option.id), 'quantity': quantity})
+
+    def test_low_stock_feed_is_sorted_by_shortfall(self):
+        response = self.client.get(reverse('low_stock'))
+        rows = response.data['results']
+        self.assertEqual([row['value'] for row in rows], ['Option 2', 'Option 1'])
+        self.assertEqual(Decimal(rows[0]['shortfall']), Decimal('20'))
+        self.assertEqual(rows[1]['product_code'], 'PROD-1000')
+
+    def test_low_stock_query_reads_the_partial_index_in_order(self):
+        plan = low_stock_queryset().order_by('margin', 'id')[:12].explain()
+        self.assertIn('subvariant_stock_margin_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_crossings_are_recorded_in_the_mutation_path(self):
+        option = self.options[0]
+        self.assertEqual(self.move(option, '6').status_code, 200)
+        self.assertEqual(self.move(option, '1').status_code, 200)
+        self.assertEqual(self.move(option, '10', name='add_stock').status_code, 200)
+        self.move(self.options[3], '10')
+
+        alerts = StockAlert.objects.order_by('CreatedDate', 'id')
+        self.assertEqual([(a.alert_type, a.stock) for a in alerts], [('LOW', Decimal('4')), ('CLEARED', Decimal('13'))])
+
+        feed = self.client.get(reverse('stock_alerts'), {'alert_type': 'low'}).data['results']
+        self.assertEqual([(row['alert_type'], row['sku']) for row in feed], [('LOW', option.sku)])
+
+    def test_bulk_movements_record_net_crossings(self):
+        first, second = self.options[0], self.options[1]
+        response = self.client.post(reverse('bulk_stock'), {'movements': [
+            {'sub_variant_id': str(first.id), 'quantity': '8', 'transaction_type': 'OUT'},
+            {'sub_variant_id': str(first.id), 'quantity': '8', 'transaction_type': 'IN'},
+            {'sub_variant_id': str(second.id), 'quantity': '5', 'transaction_type': 'IN'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(StockAlert.objects.values_list('sub_variant_id', 'alert_type')), [(second.id, 'CLEARED')])
+
+    def test_reorder_level_updates_move_options_in_and_out_of_the_feed(self):
+        option = self.options[3]
+        response = self.client.post(reverse('reorder_level'), {'sub_variant_id': str(option.id), 'reorder_level': '15'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['alert'], 'LOW')
+        self.client.post(reverse('reorder_level'), {'sub_variant_id': str(self.options[1].id), 'reorder_level': '0'})
+
+        rows = self.client.get(reverse('low_stock')).data['results']
+        self.assertEqual([row['value'] for row in rows], ['Option 2', 'Option 3'])
+        alerts = StockAlert.objects.order_by('CreatedDate', 'id')
+        self.assertEqual([(a.sub_variant_id, a.alert_type) for a in alerts], [(option.id, 'LOW'), (self.options[1].id, 'CLEARED')])
+
+        self.assertEqual(self.client.post(reverse('reorder_level'), {'sub_variant_id': str(option.id), 'reorder_level': '-1'}).status_code, 400)
+        self.assertEqual(self.client.post(reverse('reorder_level'), {'sub_variant_id': str(uuid.uuid4()), 'reorder_level': '1'}).status_code, 400)
+
+    def test_margin_filter_and_cursor_hold_at_the_last_decimal_place(self):
+        levels = ['10.00000004', '9.99999999', '10.00000001', '10.00000002']
+        for option, level in zip(self.options, levels):
+            option.reorder_level = Decimal(level)
+            option.save(update_fields=['reorder_level'])
+
+        with mock.patch.object(LowStockCursorPagination, 'page_size', 1):
+            page = self.client.get(reverse('low_stock'))
+            rows = page.data['results']
+            while page.data['next']:
+                page = self.client.get(page.data['next'])
+                rows += page.data['results']
+        self.assertEqual([row['value'] for row in rows], ['Option 0', 'Option 3', 'Option 2'])
+        self.assertEqual(Decimal(rows[0]['shortfall']), Decimal('0.00000004'))
+
+
+class StockReconcileTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+        self.client.force_authenticate(self.user)
+        self.products = [create_product(self.user, 1000 + i, variants=2, options=2) for i in range(4)]
+
+    def corrupt(self, product, total):
+        Products.objects.filter(id=product.id).update(TotalStock=total)
+
+    def test_drift_is_found_in_one_aggregate_query(self):
+        self.corrupt(self.products[1], Decimal('7'))
+        self.corrupt(self.products[3], None)
+        with self.assertNumQueries(1):
+            drift = find_drift()
+        self.assertEqual([row['ProductCode'] for row in drift], ['PROD-1001', 'PROD-1003'])
+        self.assertEqual(drift[0]['difference'], Decimal('33'))
+
+    def test_fix_is_a_single_update_and_leaves_clean_rows_alone(self):
+        self.corrupt(self.products[0], Decimal('1'))
+        self.corrupt(self.products[2], Decimal('99'))
+        response = self.client.get(reverse('stock_reconcile'))
+        self.assertEqual(len(response.data['discrepancies']), 2)
+        self.assertEqual(response.data['fixed'], 0)
+        self.assertIsNone(load_checkpoint())
+
+        response = self.client.post(reverse('stock_reconcile'))
+        self.assertEqual(response.data['fixed'], 2)
+        self.assertEqual(set(Products.objects.values_list('TotalStock', flat=True)), {Decimal('40')})
+        self.assertEqual(find_drift(), [])
+
+    def test_incremental_run_only_checks_products_changed_since_the_checkpoint(self):
+        first = reconcile_total_stock()
+        self.assertEqual(load_checkpoint(), first['checked_at'])
+        self.assertEqual(ReconcileCheckpoint.objects.get().checked_at, first['checked_at'])
+        self.assertFalse(Sequence.objects.exists())
+
+        self.corrupt(self.products[0], Decimal('1'))
+        self.corrupt(self.products[1], Decimal('1'))
+        option = SubVariant.objects.filter(variant__product=self.products[1]).first()
+        apply_stock_movement(option, Decimal('5'), 'IN', self.user)
+
+        report = reconcile_total_stock(incremental=True)
+        self.assertEqual(report['since'], first['checked_at'])
+        self.assertEqual([row['ProductCode'] for row in report['discrepancies']], ['PROD-1001'])
+        self.products[1].refresh_from_db()
+        self.assertEqual(self.products[1].TotalStock, Decimal('45'))
+        self.assertEqual(reconcile_total_stock()['fixed'], 1)
+
+    def test_register_totals_are_exact_decimals(self):
+        response = self.client.post(reverse('product_register'), {
+            'ProductID': 5000, 'ProductCode': 'PROD-5000', 'ProductName': 'Bolts',
+            'variants': [{'name': 'Size', 'options': [{'value': 'S', 'stock': '0.1'}, {'value': 'M', 'stock': '0.2'}]}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Products.objects.get(ProductID=5000).TotalStock, Decimal('0.3'))
+        self.assertEqual(reconcile_total_stock(fix=False)['discrepancies'], [])
+
+
+class AsyncReadEndpointTests(TestCase):
+
+    def setUp(self):
+        product_list_cache.clear()
+        sku_cache.clear()
+        user_cache.clear()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        now = timezone.now()
+        for i in range(15):
+            product = create_product(self.user, 1000 + i, variants=1, options=2)
+            Products.objects.filter(id=product.id).update(CreatedDate=now - timedelta(minutes=i))
+        option = SubVariant.objects.get(sku='SKU-1000-0-0')
+        for i in range(14):
+            apply_stock_movement(option, Decimal('1'), 'IN', self.user)
+        for i, transaction in enumerate(StockTransaction.objects.order_by('id')):
+            StockTransaction.objects.filter(id=transaction.id).update(CreatedDate=now - timedelta(seconds=i))
+
+    def walk(self, name, direction='next', **params):
+        pages = [self.client.get(reverse(name), params).json()]
+        while pages[-1][direction]:
+            pages.append(self.client.get(pages[-1][direction]).json())
+        return pages
+
+    def test_product_list_matches_the_sync_view(self):
+        sync = self.client.get(reverse('product_list')).json()
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('async_product_list'))
+        self.assertEqual(response.json()['results'], sync['results'])
+        self.assertIn('ETag', response)
+
+        fields = {'fields': 'ProductCode,TotalStock'}
+        self.assertEqual(
+            self.client.get(reverse('async_product_list'), fields).json()['results'],
+            self.client.get(reverse('product_list'), fields).json()['results'],
+        )
+        self.assertEqual(self.client.get(reverse('async_product_list'), {'fields': 'nope'}).status_code, 400)
+
+    def test_keyset_cursor_walks_both_ways(self):
+        pages = self.walk('async_product_list', fields='ProductCode')
+        codes = [row['ProductCode'] for page in pages for row in page['results']]
+        self.assertEqual(codes, [f'PROD-{1000 + i}' for i in range(15)])
+        self.assertIsNone(pages[0]['previous'])
+
+        back = self.client.get(pages[1]['previous']).json()
+        self.assertEqual(back['results'], pages[0]['results'])
+        self.assertIsNone(back['previous'])
+        self.assertEqual(self.client.get(reverse('async_product_list'), {'cursor': 'bogus'}).status_code, 400)
+
+    def test_stock_report_matches_the_sync_view(self):
+        sync = self.client.get(reverse('stock_transaction_list')).json()
+        response = self.client.get(reverse('async_stock_transaction_list'))
+        self.assertEqual(response.json()['results'], sync['results'])
+        pages = self.walk('async_stock_transaction_list')
+        self.assertEqual(sum(len(page['results']) for page in pages), 14)
+
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            cached = self.client.get(reverse('async_stock_transaction_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(
+            self.client.get(reverse('async_stock_transaction_list'), {'start_date': '2024-13-01'}).status_code, 400,
+        )
+
+    def test_sku_scan_matches_the_sync_view(self):
+        self.assertEqual(
+            self.client.get(reverse('async_sku_scan', args=['SKU-1001-0-1'])).content,
+            self.client.get(reverse('sku_scan', args=['SKU-1001-0-1'])).content,
+        )
+        skus = {'skus': ['SKU-1000-0-0', 'SKU-1002-0-0', 'missing']}
+        self.assertEqual(
+            self.client.post(reverse('async_sku_scan_many'), skus, format='json').json(),
+            self.client.post(reverse('sku_scan_many'), skus, format='json').json(),
+        )
+        self.assertEqual(self.client.get(reverse('async_sku_scan', args=['missing'])).status_code, 404)
+
+        anonymous = APIClient().get(reverse('async_sku_scan', args=['SKU-1001-0-1']))
+        self.assertEqual(anonymous.status_code, 401)
+        self.assertIn('WWW-Authenticate', anonymous)
+
+    async def test_async_requests_are_timed_through_the_async_middleware(self):
+        token = RefreshToken.for_user(self.user).access_token
+        response = await self.async_client.get(
+            reverse('async_product_list'), headers={'Authorization': f'Bearer {token}'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 12)
+        # The token's user on a cold cache, then the product, variant and option pages.
+        self.assertIn('desc="4 queries"', response['Server-Timing'])
+        self.assertIn('serialize;dur=', response['Server-Timing'])
+
+
+class RequestMetricsTests(TestCase):
+
+    def setUp(self):
+        product_list_cache.clear()
+        registry.reset()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+        create_product(self.user, 1000, variants=2, options=2)
+
+    def test_server_timing_reports_queries_and_sections(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('product_list'))
+        timing = response['Server-Timing']
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+        for name in ('db;dur=', 'serialize;dur=', 'render;dur=', 'total;dur='):
+            self.assertIn(name, timing)
+
+    def test_metrics_endpoint_exposes_per_view_histograms(self):
+        self.client.get(reverse('product_list'))
+        self.client.get(reverse('product_list'))
+        self.client.get(reverse('stock_transaction_list'))
+
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn('http_request_duration_seconds_count{method="GET",view="ProductListView"} 2', body)
+        self.assertIn('http_request_db_queries_bucket{method="GET",view="StockTransactionListView",le="+Inf"} 1', body)
+        self.assertIn('http_request_serialize_seconds_sum{method="GET",view="ProductListView"}', body)
+
+    def test_metrics_endpoint_is_limited_to_allowed_addresses_or_the_token(self):
+        remote = {'REMOTE_ADDR': '203.0.113.7'}
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+        self.assertEqual(self.client.get(reverse('metrics'), **remote).status_code, 403)
+        with self.settings(METRICS_TOKEN='scrape-secret'):
+            self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong', **remote).status_code, 403)
+            self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-secret', **remote).status_code, 200)
+        with self.settings(METRICS_ALLOWED_IPS=[]):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+    def test_slow_query_log_is_opt_in(self):
+        with self.assertNoLogs('src.slow_query'):
+            self.client.get(reverse('stock_transaction_list'))
+        with self.settings(SLOW_QUERY_MS=0):
+            with self.assertLogs('src.slow_query', level='WARNING') as logs:
+                self.client.get(reverse('stock_transaction_list'))
+        self.assertIn('StockTransactionListView', logs.output[0])
+        self.assertIn('products_stock_transaction', logs.output[0])
+        self.assertTrue(any('Product/views.py' in line for line in logs.output))
+
+
+class LoggingPipelineTests(SimpleTestCase):
+
+    def make_record(self, name='src.Product.views', level=logging.INFO, msg='Returning %d products', args=(12,)):
+        return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+    def test_sampling_keeps_one_info_line_in_n_and_every_warning(self):
+        sampler = SamplingFilter({'src.Product': 4})
+        kept = [sampler.filter(self.make_record()) for _ in range(12)]
+        self.assertEqual(kept.count(True), 3)
+        self.assertTrue(all(sampler.filter(self.make_record(level=logging.WARNING)) for _ in range(5)))
+        self.assertTrue(sampler.filter(self.make_record(name='src.Usermgmt.views')))
+
+    def test_queue_handler_renders_the_message_on_the_calling_thread(self):
+        records = queue.SimpleQueue()
+        handler = AsyncQueueHandler(records)
+        items = ['a']
+        record = self.make_record(msg='Items %s', args=(items,))
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            record.exc_info = sys.exc_info()
+        handler.handle(record)
+        items.append('b')
+
+        queued = records.get_nowait()
+        self.assertIsNot(queued, record)
+        self.assertEqual((queued.msg, queued.args, queued.exc_info), ("Items ['a']", None, None))
+        self.assertIn('ValueError: boom', queued.exc_text)
+        line = logging.Formatter('%(levelname)s %(message)s').format(queued)
+        self.assertTrue(line.startswith("INFO Items ['a']\nTraceback"))
+        self.assertIn('ValueError: boom', json.loads(JsonFormatter().format(queued))['exception'])
+
+    def test_json_formatter_emits_one_object_per_line(self):
+        line = JsonFormatter().format(self.make_record())
+        entry = json.loads(line)
+        self.assertEqual(entry['message'], 'Returning 12 products')
+        self.assertEqual(entry['level'], 'INFO')
+        self.assertEqual(entry['logger'], 'src.Product.views')
+        self.assertEqual(parse_sample_rates('src.Product.views=10, bad, django=x'), {'src.Product.views': 10})
 
-# Create your tests here.
@@ -1,11 +1,31 @@
 from django.urls import path
-from .views import ProductRegisterView, ProductListView, AddStockView, RemoveStockView, StockTransactionListView,ProductCodePreviewView
+from .async_views import AsyncProductListView, AsyncSkuScanView, AsyncStockTransactionListView
+from .views import ProductRegisterView, ProductListView, AddStockView, RemoveStockView, StockTransactionListView,ProductCodePreviewView, BulkStockView, ProductImportView, StockExportView, StockSummaryView, StockAsOfView, ProductListCacheStatsView, ProductRenditionStatusView, ProductSearchView, SkuScanView, LowStockView, ReorderLevelView, StockAlertListView, StockReconcileView
 
 urlpatterns = [
     path('register/', ProductRegisterView.as_view(), name='product_register'),  
+    path('import/', ProductImportView.as_view(), name='product_import'),
     path('list/', ProductListView.as_view(), name='product_list'),       
+    path('list/cache-stats/', ProductListCacheStatsView.as_view(), name='product_list_cache_stats'),
+    path('search/', ProductSearchView.as_view(), name='product_search'),
+    path('scan/', SkuScanView.as_view(), name='sku_scan_many'),
+    path('scan/<str:sku>/', SkuScanView.as_view(), name='sku_scan'),
     path('add_stock/', AddStockView.as_view(), name='add_stock'),            
     path('remove_stock/', RemoveStockView.as_view(), name='remove_stock'),   
+    path('bulk_stock/', BulkStockView.as_view(), name='bulk_stock'),
     path('stock-report/', StockTransactionListView.as_view(), name='stock_transaction_list'),
+    path('stock-summary/', StockSummaryView.as_view(), name='stock_summary'),
+    path('stock-as-of/', StockAsOfView.as_view(), name='stock_as_of'),
+    path('stock-export/', StockExportView.as_view(), name='stock_export'),
+    path('low-stock/', LowStockView.as_view(), name='low_stock'),
+    path('reorder-level/', ReorderLevelView.as_view(), name='reorder_level'),
+    path('stock-alerts/', StockAlertListView.as_view(), name='stock_alerts'),
+    path('stock-reconcile/', StockReconcileView.as_view(), name='stock_reconcile'),
+    path('async/list/', AsyncProductListView.as_view(), name='async_product_list'),
+    path('async/stock-report/', AsyncStockTransactionListView.as_view(), name='async_stock_transaction_list'),
+    path('async/scan/', AsyncSkuScanView.as_view(), name='async_sku_scan_many'),
+    path('async/scan/<str:sku>/', AsyncSkuScanView.as_view(), name='async_sku_scan'),
+    path('renditions/', ProductRenditionStatusView.as_view(), name='product_renditions'),
+    path('renditions/<uuid:product_id>/', ProductRenditionStatusView.as_view(), name='product_rendition_status'),
      path('next-code/', ProductCodePreviewView.as_view(), name='product-next-code'), 
 ]
\ No newline at end of file
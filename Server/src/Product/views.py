@@ -1,18 +1,36 @@
-from datetime import datetime
+import io
+import json
+import uuid
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated ,AllowAny
-from .models import Products, StockTransaction
-from .serializers import ProductSerializer, StockTransactionSerializer,StockGetTransactionSerializer
-from src.constant.Pagination import CustomCursorPagination
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from .models import Products, SubVariant, StockAlert, StockDailyRollup
+from .serializers import ProductSerializer, StockTransactionSerializer,StockGetTransactionSerializer, BulkStockTransactionSerializer, LowStockSerializer, ReorderLevelSerializer, StockAlertSerializer
+from src.constant.Pagination import CustomCursorPagination, LowStockCursorPagination
+from src.Usermgmt.authentication import CachedJWTAuthentication
 from rest_framework.generics import ListAPIView
+from rest_framework.parsers import MultiPartParser
+from django.http import StreamingHttpResponse
+from django.db.models import Sum
 from django.utils.dateparse import parse_date
-from django.utils.timezone import make_aware
-from datetime import datetime, time
-from src.utils.product import generate_product_id_and_code
-from src.utils.image_utils import decode_base64_image
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from src.utils.product import generate_product_id_and_code, get_product_list_queryset, parse_product_fields
+from src.utils.image_utils import ImageTooLarge, LimitedImageUploadHandler, decode_base64_image, image_max_bytes
+from src.utils.catalog_import import import_products
+from src.utils.stock_export import EXPORT_FORMATS, date_range_filters, stock_report_queryset, stream_stock_export
+from src.utils.stock_alerts import low_stock_queryset
+from src.utils.stock_reconcile import reconcile_total_stock
+from src.utils.stock_snapshot import stock_as_of
+from src.utils.cache import product_list_cache, product_list_cache_key
+from src.utils.conditional import product_list_etag, stock_report_etag
+from src.utils.image_renditions import renditions
+from src.utils.metrics import section
+from src.utils.search import decode_cursor, encode_cursor, search_product_ids
+from src.utils.sku_lookup import lookup_skus
+from urllib.parse import urlencode
+from django.db import transaction
 
 
 from src.constant.Logging import get_logger
@@ -22,32 +40,141 @@ logger = get_logger(__name__)
     
 
 class ProductListView(APIView):
+    read_from_replica = True
     permission_classes = [AllowAny]
     pagination_class = CustomCursorPagination
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
+    @method_decorator(condition(etag_func=product_list_etag))
     def get(self, request):
         try:
-            queryset = Products.objects.filter(Active=True).order_by('-CreatedDate')
+            cache_key = product_list_cache_key(request)
+            data = product_list_cache.get(cache_key)
+            if data is not None:
+                return Response(data)
+
+            fields, includes = parse_product_fields(request.query_params)
+            include_variants = 'variants' in includes
+            queryset = get_product_list_queryset(fields, include_variants)
             
             paginator = self.pagination_class()
             page = paginator.paginate_queryset(queryset, request)
-            serializer = ProductSerializer(page, many=True)
+            if fields is not None and include_variants:
+                fields = fields + ['variants']
+            serializer = ProductSerializer(page, many=True, fields=fields)
+            with section('serialize'):
+                data = serializer.data
             
-            logger.info("Returning %d products after pagination", len(serializer.data))
-            return paginator.get_paginated_response(serializer.data)
+            logger.info("Returning %d products after pagination", len(data))
+            response = paginator.get_paginated_response(data)
+            product_list_cache.set(cache_key, response.data)
+            return response
         
         except Exception as e:
-            logger.error(f"Error listing products: {str(e)}")
+            logger.error("Error listing products: %s", e)
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+
+class ProductListCacheStatsView(APIView):
+    
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        
+        return Response(product_list_cache.stats())
+
+
+
+class ProductSearchView(APIView):
+    
+    permission_classes = [AllowAny]
+    authentication_classes = [CachedJWTAuthentication]
+    page_size = 12
+    result_fields = ('id', 'ProductID', 'ProductCode', 'ProductName', 'HSNCode', 'TotalStock')
+
+    def get(self, request):
+        
+        query = request.query_params.get("q", "")
+        try:
+            offset = decode_cursor(request.query_params.get("cursor"))
+            fields, _ = parse_product_fields(request.query_params, allowed=self.result_fields, includes=())
+        except ValueError as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+        matches, has_more = search_product_ids(query, offset, self.page_size)
+        products = Products.objects.filter(id__in=[product_id for product_id, _ in matches]).values(
+            *(fields or self.result_fields)
+        )
+        by_id = {product['id']: product for product in products}
+        results = [
+            {**by_id[product_id], 'score': round(-score, 4)}
+            for product_id, score in matches if product_id in by_id
+        ]
+
+        def link(cursor_offset):
+            params = {'q': query}
+            if fields:
+                params['fields'] = request.query_params['fields']
+            if cursor_offset:
+                params['cursor'] = encode_cursor(cursor_offset)
+            return f"{request.path}?{urlencode(params)}"
+
+        return Response({
+            "next": link(offset + self.page_size) if has_more else None,
+            "previous": link(max(0, offset - self.page_size)) if offset else None,
+            "results": results,
+        })
+
+
+
+class SkuScanView(APIView):
+    
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CachedJWTAuthentication]
+    max_skus = 500
+
+    def get(self, request, sku):
+        
+        result = lookup_skus([sku]).get(sku)
+        if result is None:
+            return Response({'error': 'SKU not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(result)
+
+    def post(self, request):
+        
+        skus = request.data.get("skus")
+        if not isinstance(skus, list) or not all(isinstance(sku, str) for sku in skus):
+            return Response({'error': 'skus must be a list of strings'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(skus) > self.max_skus:
+            return Response({'error': f'At most {self.max_skus} skus per request'}, status=status.HTTP_400_BAD_REQUEST)
+
+        found = lookup_skus(skus)
+        return Response({
+            'results': [found[sku] for sku in dict.fromkeys(skus) if sku in found],
+            'missing': [sku for sku in dict.fromkeys(skus) if sku not in found],
+        })
+
         
 class StockTransactionListView(ListAPIView):
     
+    read_from_replica = True
     permission_classes = [AllowAny]
     pagination_class = CustomCursorPagination
     serializer_class = StockGetTransactionSerializer
 
+    @method_decorator(condition(etag_func=stock_report_etag))
+    def get(self, request, *args, **kwargs):
+        
+        return super().get(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        with section('serialize'):
+            data = self.get_serializer(page, many=True).data
+        return self.get_paginated_response(data)
+
     def get_queryset(self):
         
         start_date = self.request.query_params.get("start_date")
@@ -55,36 +182,219 @@ class StockTransactionListView(ListAPIView):
 
         logger.info("Fetching stock transactions: start_date=%s, end_date=%s", start_date, end_date)
         
+        try:
+            filters = date_range_filters(start_date, end_date)
+        except ValueError as e:
+            logger.warning("Invalid stock report dates: %s", e)
+            raise
+
+        return stock_report_queryset(filters).order_by('-CreatedDate')
+
+
+
+class LowStockView(ListAPIView):
+    
+    read_from_replica = True
+    permission_classes = [AllowAny]
+    authentication_classes = [CachedJWTAuthentication]
+    pagination_class = LowStockCursorPagination
+    serializer_class = LowStockSerializer
+
+    def get_queryset(self):
+        
+        return low_stock_queryset().select_related('variant__product').only(
+            'id', 'sku', 'value', 'stock', 'reorder_level',
+            'variant__name', 'variant__product__ProductName', 'variant__product__ProductCode',
+        )
+
+
+
+class ReorderLevelView(APIView):
+    
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CachedJWTAuthentication]
+
+    def post(self, request):
+        
+        logger.info("Reorder level update by user %s", request.user)
+        serializer = ReorderLevelSerializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+            return Response(serializer.save(), status=200)
+
+        except Exception as e:
+            logger.error("Reorder level update failed: %s", e)
+            return Response({'error': str(e)}, status=400)
+
+
+
+class StockAlertListView(ListAPIView):
+    
+    read_from_replica = True
+    permission_classes = [AllowAny]
+    authentication_classes = [CachedJWTAuthentication]
+    pagination_class = CustomCursorPagination
+    serializer_class = StockAlertSerializer
+
+    def get_queryset(self):
+        
+        alerts = StockAlert.objects.select_related('sub_variant__variant__product').only(
+            'id', 'alert_type', 'stock', 'reorder_level', 'CreatedDate',
+            'sub_variant__sku', 'sub_variant__value', 'sub_variant__variant__product__ProductName',
+        )
+        alert_type = self.request.query_params.get("alert_type")
+        if alert_type:
+            alerts = alerts.filter(alert_type=alert_type.upper())
+        return alerts
+
+
+
+class StockReconcileView(APIView):
+    
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CachedJWTAuthentication]
+
+    # GET reports drift without touching anything; POST fixes it and moves the checkpoint.
+    def get(self, request):
+        
+        return self.reconcile(request, fix=False)
+
+    def post(self, request):
+        
+        return self.reconcile(request, fix=True)
+
+    def reconcile(self, request, fix):
+        
+        incremental = str(request.query_params.get("incremental", "")).lower() in ("1", "true", "yes")
+        try:
+            report = reconcile_total_stock(incremental=incremental, fix=fix)
+        except Exception as e:
+            logger.error("Stock reconciliation failed: %s", e)
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        logger.info("Stock reconciliation (%s): %d discrepancies, %d fixed", report['mode'], len(report['discrepancies']), report['fixed'])
+        return Response(report)
+
+
+
+class StockExportView(APIView):
+    
+    read_from_replica = True
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CachedJWTAuthentication]
+
+    def get(self, request):
+        
+        file_format = request.query_params.get("file_format", "csv")
+        compress = request.query_params.get("gzip") in ("1", "true")
+        
+        if file_format not in EXPORT_FORMATS:
+            return Response({'error': 'file_format must be csv or jsonl'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            filters = date_range_filters(request.query_params.get("start_date"), request.query_params.get("end_date"))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        logger.info("Exporting stock transactions as %s (gzip=%s) for user %s", file_format, compress, request.user)
+
+        # A gzipped export is a .gz file to keep, not a transfer encoding: with Content-Encoding
+        # set, browsers and curl --compressed would unpack it and save plain text as .gz.
+        filename = f"stock-transactions.{file_format}" + (".gz" if compress else "")
+        if compress:
+            content_type = "application/gzip"
+        else:
+            content_type = "text/csv" if file_format == "csv" else "application/x-ndjson"
+        response = StreamingHttpResponse(stream_stock_export(filters, file_format, compress), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+
+class StockSummaryView(APIView):
+    
+    read_from_replica = True
+    permission_classes = [AllowAny]
+    authentication_classes = [CachedJWTAuthentication]
+
+    def get(self, request):
+        
+        # Reads only the daily rollup, never the ledger, so cost tracks days not transactions.
         filters = {}
+        for param, lookup in (("product", "product_id"), ("sub_variant", "sub_variant_id")):
+            if request.query_params.get(param):
+                filters[lookup] = request.query_params[param]
 
-        if start_date:
-            parsed_start_date = parse_date(start_date)
-            if parsed_start_date:
-                filters["CreatedDate__gte"] = make_aware(
-                    datetime.combine(parsed_start_date, time.min)
-                )
-            else:
-                logger.warning("Invalid start_date format: %s", start_date)
-                raise ValueError("Invalid start_date format. Use YYYY-MM-DD")
-
-        if end_date:
-            parsed_end_date = parse_date(end_date)
-            if parsed_end_date:
-                filters["CreatedDate__lte"] = make_aware(
-                    datetime.combine(parsed_end_date, time.max)
-                )
+        for param, lookup in (("start_date", "day__gte"), ("end_date", "day__lte")):
+            value = request.query_params.get(param)
+            if value:
+                parsed = parse_date(value)
+                if not parsed:
+                    return Response({'error': f'Invalid {param} format. Use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+                filters[lookup] = parsed
+
+        try:
+            rows = (
+                StockDailyRollup.objects.filter(**filters)
+                .values('day', 'transaction_type')
+                .annotate(quantity=Sum('quantity'), transaction_count=Sum('transaction_count'))
+                .order_by('day', 'transaction_type')
+            )
+            return Response({'results': list(rows)})
+        
+        except Exception as e:
+            logger.error("Error building stock summary: %s", e)
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+
+class StockAsOfView(APIView):
+    
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CachedJWTAuthentication]
+
+    def get(self, request):
+        
+        try:
+            filters = date_range_filters(None, request.query_params.get("date"))
+        except ValueError as e:
+            return Response({'error': str(e).replace('end_date', 'date')}, status=status.HTTP_400_BAD_REQUEST)
+        if not filters:
+            return Response({'error': 'date is required'}, status=status.HTTP_400_BAD_REQUEST)
+        at = filters["CreatedDate__lte"]
+
+        options = SubVariant.objects.select_related('variant').only('id', 'sku', 'value', 'stock', 'variant__name')
+        try:
+            if request.query_params.get("sub_variant"):
+                options = options.filter(id=uuid.UUID(request.query_params["sub_variant"]))
+            elif request.query_params.get("product"):
+                options = options.filter(variant__product_id=uuid.UUID(request.query_params["product"]))
             else:
-                logger.warning("Invalid end_date format: %s", end_date)
-                raise ValueError("Invalid end_date format. Use YYYY-MM-DD")
+                return Response({'error': 'product or sub_variant is required'}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError:
+            return Response({'error': 'product and sub_variant must be UUIDs'}, status=status.HTTP_400_BAD_REQUEST)
 
-        queryset = StockTransaction.objects.filter(**filters).order_by('-CreatedDate')
-        logger.info("Found %d stock transactions", queryset.count())
-        return queryset
+        try:
+            results = [
+                {
+                    'sub_variant_id': option.id,
+                    'sku': option.sku,
+                    'variant_name': option.variant.name,
+                    'option_value': option.value,
+                    'stock': stock_as_of(option, at),
+                }
+                for option in options.order_by('variant__CreatedDate', 'CreatedDate')
+            ]
+            return Response({'as_of': at, 'results': results})
+        
+        except Exception as e:
+            logger.error("Error computing stock as of %s: %s", at, e)
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
     
 class AddStockView(APIView):
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def post(self, request):
         logger.info("Add stock request by user %s", request.user)
@@ -101,14 +411,14 @@ class AddStockView(APIView):
             return Response({'status': 'Stock added successfully'}, status=200)
     
         except Exception as e:
-            logger.error("Add stock failed: %s", str(e))
+            logger.error("Add stock failed: %s", e)
             return Response({'error': str(e)}, status=400)
 
 
 class RemoveStockView(APIView):
     
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def post(self, request):
         
@@ -126,7 +436,34 @@ class RemoveStockView(APIView):
             return Response({'status': 'Stock removed successfully'}, status=200)
    
         except Exception as e:
-            logger.error("Remove stock failed: %s", str(e))
+            logger.error("Remove stock failed: %s", e)
+            return Response({'error': str(e)}, status=400)
+
+
+
+class BulkStockView(APIView):
+    
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CachedJWTAuthentication]
+
+    def post(self, request):
+        
+        logger.info("Bulk stock request by user %s", request.user)
+        
+        serializer = BulkStockTransactionSerializer(data=request.data, context={'request': request})
+        try:
+            serializer.is_valid(raise_exception=True)
+            results = serializer.create(serializer.validated_data)
+            
+            applied = sum(1 for result in results if result['status'] == 'ok')
+            return Response({
+                'applied': applied,
+                'failed': len(results) - applied,
+                'results': results,
+            }, status=200)
+   
+        except Exception as e:
+            logger.error("Bulk stock failed: %s", e)
             return Response({'error': str(e)}, status=400)
         
         
@@ -149,14 +486,71 @@ class ProductRegisterView(APIView):
 
     def post(self, request):
 
-        image_file = decode_base64_image(request.data.get("ProductImage"))
-        if image_file:
-            request.data["ProductImage"] = image_file
+        # JSON bodies carry the image as a base64 data URI; multipart bodies stream it as a
+        # file through LimitedImageUploadHandler. Either way the size limit applies early.
+        content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+        if content_length > image_max_bytes() * 4 // 3 + 64 * 1024:
+            raise ImageTooLarge()
+        request.upload_handlers.insert(0, LimitedImageUploadHandler(request))
+
+        data = request.data.dict() if hasattr(request.data, "dict") else dict(request.data)
+        if isinstance(data.get("variants"), str):
+            try:
+                data["variants"] = json.loads(data["variants"])
+            except ValueError:
+                return Response({'variants': ['Must be a JSON list']}, status=status.HTTP_400_BAD_REQUEST)
+
+        if isinstance(data.get("ProductImage"), str):
+            data["ProductImage"] = decode_base64_image(data["ProductImage"])
 
-        request.data["CreatedUser"] = request.user.id
+        data["CreatedUser"] = request.user.id
 
-        serializer = ProductSerializer(data=request.data)
+        serializer = ProductSerializer(data=data)
         if serializer.is_valid():
-            serializer.save()
+            product = serializer.save()
+            if product.ProductImage:
+                transaction.on_commit(lambda: renditions.submit(product.id))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ProductImportView(APIView):
+    
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        
+        # Django spools large uploads to a temp file; the importer reads it line by line.
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        file_format = request.data.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+        if file_format not in ('csv', 'jsonl'):
+            return Response({'error': 'format must be csv or jsonl'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            stream = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+            report = import_products(stream, file_format, request.user)
+            return Response(report.as_dict(), status=status.HTTP_201_CREATED)
+        
+        except Exception as e:
+            logger.error("Product import failed: %s", e)
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+
+class ProductRenditionStatusView(APIView):
+    
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, product_id=None):
+        
+        if product_id is None:
+            return Response(renditions.stats())
+
+        job = renditions.status(product_id)
+        if job is None:
+            return Response({'error': 'No rendition job for this product'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job)
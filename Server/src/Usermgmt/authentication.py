@@ -0,0 +1,72 @@
+import copy
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from src.utils.cache import LRUCache
+
+user_cache = LRUCache(
+    max_entries=getattr(settings, 'JWT_USER_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'JWT_USER_CACHE_TTL', 60),
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    # Resolves the token's user from a short-lived in-process cache instead of loading the
+    # row on every request. Saves and deletes of the user drop the entry (see signals), and
+    # the TTL bounds staleness in other worker processes.
+
+    def get_user(self, validated_token):
+        user = self.get_cached_user(validated_token)
+        if user is None:
+            user = self.load_user(validated_token)
+        return user
+
+    async def aauthenticate(self, request):
+
+        # authenticate() for async views: token checks are pure CPU, so only a cache miss
+        # leaves the event loop.
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        user = self.get_cached_user(validated_token)
+        if user is None:
+            user = await sync_to_async(self.load_user)(validated_token)
+        return user, validated_token
+
+    def user_key(self, validated_token):
+        try:
+            return str(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    def load_user(self, validated_token):
+        user = super().get_user(validated_token)
+        user_cache.set(self.user_key(validated_token), user)
+        return copy.copy(user)
+
+    def get_cached_user(self, validated_token):
+        user = user_cache.get(self.user_key(validated_token))
+        if user is None:
+            return None
+
+        # The cached row was valid for the token that loaded it; this token still has to
+        # pass the same checks.
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return copy.copy(user)
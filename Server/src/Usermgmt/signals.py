@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .models import CustomUser
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def user_changed(sender, instance, **kwargs):
+    
+    # Deactivation, staff and password changes must reach the next request.
+    user_cache.delete(str(instance.pk))
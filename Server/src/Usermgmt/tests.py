@@ -1,3 +1,107 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import user_cache
+from .throttling import hashing_slots
+from .models import CustomUser
+
+
+class CachedJWTAuthenticationTests(TestCase):
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+        self.client = APIClient()
+        self.authorize(self.user)
+
+    def authorize(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+
+    def test_steady_state_requests_skip_the_user_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(reverse('product_list_cache_stats')).status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('product_list_cache_stats'))
+        self.assertEqual(response.wsgi_request.user.email, 'owner@example.com')
+
+    def test_deactivation_takes_effect_on_the_next_request(self):
+        self.client.get(reverse('product_list_cache_stats'))
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('product_list_cache_stats')).status_code, 401)
+
+    def test_cached_user_is_not_shared_between_requests(self):
+        self.client.get(reverse('product_list_cache_stats'))
+        other = APIClient()
+        other.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        first = other.get(reverse('product_list_cache_stats')).wsgi_request.user
+        second = self.client.get(reverse('product_list_cache_stats')).wsgi_request.user
+        self.assertEqual(first.pk, second.pk)
+        self.assertIsNot(first, second)
+
+
+THROTTLE_RATES = {'login_ip': '5/min', 'login_email': '2/min', 'register_ip': '3/hour'}
+
+
+@override_settings(REST_FRAMEWORK={'DEFAULT_THROTTLE_RATES': THROTTLE_RATES})
+class AuthThrottleTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        CustomUser.objects.create_user(email='owner@example.com', password='secret-pass-123')
+
+    def login(self, email, ip='10.0.0.1'):
+        return self.client.post(
+            reverse('auth_login'), {'email': email, 'password': 'wrong'}, REMOTE_ADDR=ip,
+        )
+
+    def test_email_bucket_rejects_before_hashing(self):
+        self.assertEqual(self.login('owner@example.com').status_code, 401)
+        self.assertEqual(self.login('OWNER@example.com', ip='10.0.0.2').status_code, 401)
+
+        with mock.patch('src.Usermgmt.serializers.authenticate') as authenticate:
+            response = self.login('owner@example.com', ip='10.0.0.3')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        authenticate.assert_not_called()
+
+        self.assertEqual(self.login('other@example.com', ip='10.0.0.3').status_code, 401)
+
+    def test_ip_bucket_covers_login_and_token_endpoints(self):
+        for i in range(4):
+            self.assertEqual(self.login(f'user{i}@example.com').status_code, 401)
+        response = self.client.post(
+            reverse('token_obtain_pair'), {'email': 'user9@example.com', 'password': 'wrong'}, REMOTE_ADDR='10.0.0.1',
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.login('user10@example.com').status_code, 429)
+        self.assertEqual(self.login('user10@example.com', ip='10.0.0.9').status_code, 401)
+
+    def test_registration_is_limited_per_ip(self):
+        for i in range(3):
+            response = self.client.post(reverse('auth_register'), {'email': f'new{i}@example.com', 'password': 'pw-123456'})
+            self.assertEqual(response.status_code, 201)
+        response = self.client.post(reverse('auth_register'), {'email': 'new9@example.com', 'password': 'pw-123456'})
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(CustomUser.objects.filter(email='new9@example.com').exists())
+
+    @override_settings(PASSWORD_HASH_WAIT_SECONDS=0.01)
+    def test_hashing_is_refused_when_every_slot_is_busy(self):
+        taken = 0
+        while hashing_slots.acquire(blocking=False):
+            taken += 1
+        try:
+            with mock.patch('src.Usermgmt.serializers.authenticate') as authenticate:
+                response = self.login('owner@example.com')
+            self.assertEqual(response.status_code, 503)
+            authenticate.assert_not_called()
+        finally:
+            for _ in range(taken):
+                hashing_slots.release()
+        self.assertEqual(self.login('owner@example.com').status_code, 401)
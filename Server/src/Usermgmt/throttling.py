@@ -0,0 +1,108 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+_bucket_lock = threading.Lock()
+hashing_slots = threading.BoundedSemaphore(getattr(settings, 'PASSWORD_HASH_CONCURRENCY', 2))
+
+
+class HashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-in attempts in progress, try again shortly.'
+    default_code = 'hashing_busy'
+
+
+def parse_rate(rate):
+
+    # Same "<requests>/<s|m|h|d>" format as DRF's DEFAULT_THROTTLE_RATES.
+    if rate is None:
+        return None, None
+    num, period = rate.split('/')
+    return int(num), {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+
+
+@contextmanager
+def hashing_slot():
+
+    # PBKDF2 work runs on the workers that serve stock updates; cap how many requests
+    # hash at once and turn the rest away instead of letting them queue up.
+    if not hashing_slots.acquire(timeout=getattr(settings, 'PASSWORD_HASH_WAIT_SECONDS', 1.0)):
+        raise HashingBusy()
+    try:
+        yield
+    finally:
+        hashing_slots.release()
+
+
+class TokenBucketThrottle(BaseThrottle):
+
+    # A bucket holding the rate's request count, refilled evenly over its period and kept in
+    # the local cache. Bursts up to the bucket size pass; sustained traffic is held to
+    # the rate. Runs in APIView.initial(), before the body is validated or hashed.
+
+    scope = None
+    cache_alias = 'default'
+
+    def __init__(self):
+        self.capacity, self.period = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(self.scope))
+        self.wait_seconds = None
+
+    def get_ident_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        if self.capacity is None:
+            return True
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return True
+
+        key = f'throttle:{self.scope}:{ident}'
+        refill = self.capacity / self.period
+        cache = caches[self.cache_alias]
+        with _bucket_lock:
+            now = time.monotonic()
+            tokens, updated = cache.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * refill)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            cache.set(key, (tokens, now), self.period)
+
+        self.wait_seconds = None if allowed else (1 - tokens) / refill
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
+
+
+class EmailTokenBucketThrottle(TokenBucketThrottle):
+
+    def get_ident_key(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+class LoginIPThrottle(IPTokenBucketThrottle):
+    scope = 'login_ip'
+
+
+class LoginEmailThrottle(EmailTokenBucketThrottle):
+    scope = 'login_email'
+
+
+class RegisterIPThrottle(IPTokenBucketThrottle):
+    scope = 'register_ip'
@@ -2,8 +2,10 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.permissions import IsAuthenticated
 from .serializers import RegisterSerializer, LoginSerializer
+from .throttling import LoginEmailThrottle, LoginIPThrottle, RegisterIPThrottle, hashing_slot
 
 from src.constant.Logging import get_logger
 
@@ -14,13 +16,15 @@ logger = get_logger(__name__)
 class RegisterView(APIView):
     
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [RegisterIPThrottle]
 
     def post(self, request):
         
         serializer = RegisterSerializer(data=request.data)
         
         if serializer.is_valid():
-            serializer.save()
+            with hashing_slot():
+                serializer.save()
             return Response({"message": "User registered successfully"}, status=status.HTTP_201_CREATED)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -29,12 +33,15 @@ class RegisterView(APIView):
 class LoginView(APIView):
     
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
 
     def post(self, request):
         
         serializer = LoginSerializer(data=request.data)
+        with hashing_slot():
+            valid = serializer.is_valid()
         
-        if serializer.is_valid():
+        if valid:
 
             user = serializer.validated_data['user']
             refresh = RefreshToken.for_user(user)
@@ -48,6 +55,17 @@ class LoginView(APIView):
         return Response(serializer.errors, status=status.HTTP_401_UNAUTHORIZED)
 
 
+class ThrottledTokenObtainPairView(TokenObtainPairView):
+    
+    # /api/token/ checks the password too, so it gets the same limits as LoginView.
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
+
+    def post(self, request, *args, **kwargs):
+        
+        with hashing_slot():
+            return super().post(request, *args, **kwargs)
+
+
 class UserProfileView(APIView):
     
     permission_classes = [IsAuthenticated]
@@ -55,11 +73,11 @@ class UserProfileView(APIView):
     def get(self, request):
         try:
             user = request.user
-            logger.info(f"User profile requested by {user.username}")
+            logger.info("User profile requested by %s", user.username)
             return Response({
                 'username': user.username,
                 'email': user.email
             }, status=status.HTTP_200_OK)
         except Exception as e:
-            logger.error(f"Error fetching user profile: {str(e)}")
+            logger.error("Error fetching user profile: %s", e)
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
@@ -1,6 +1,12 @@
+import atexit
+import copy
+import itertools
+import json
 import logging
 import logging.config
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 import colorlog
 
@@ -8,6 +14,81 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 LOG_DIR = os.path.join(BASE_DIR, 'logs')
 os.makedirs(LOG_DIR, exist_ok=True)
 
+# Production defaults: INFO and up, so DEBUG calls return before a record is built.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+# "logger=N" pairs; INFO and below from those loggers (and their children) keep 1 line in N.
+LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')
+
+
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, self.datefmt),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.counters = {name: itertools.count() for name in self.rates}
+
+    def rate_for(self, name):
+        while name:
+            if name in self.rates:
+                return name, self.rates[name]
+            name = name.rpartition('.')[0]
+        return None, 1
+
+    def filter(self, record):
+        if record.levelno > logging.INFO:
+            return True
+        name, rate = self.rate_for(record.name)
+        if rate <= 1:
+            return True
+        return next(self.counters[name]) % rate == 0
+
+
+_traceback_formatter = logging.Formatter()
+
+
+class AsyncQueueHandler(QueueHandler):
+
+    # Like QueueHandler.prepare, the message and traceback are rendered on the calling
+    # thread, so arguments mutated after the call or gone with the frame cannot change the
+    # line. Unlike it, the record is not run through a formatter: the timestamp, level and
+    # layout are still applied by each handler on the listener thread.
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+def parse_sample_rates(value):
+
+    rates = {}
+    for item in value.split(','):
+        name, _, rate = item.partition('=')
+        if name.strip() and rate.strip().isdigit():
+            rates[name.strip()] = int(rate)
+    return rates
+
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -29,32 +110,68 @@ LOGGING = {
                 'CRITICAL': 'bold_red',
             },
         },
+        'json': {
+            '()': JsonFormatter,
+            'datefmt': '%Y-%m-%dT%H:%M:%S%z',
+        },
     },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
-            'formatter': 'color',
+            'formatter': 'json' if LOG_FORMAT == 'json' else 'color',
             'level': 'DEBUG',
         },
         'file': {
-            'class': 'logging.FileHandler',
+            'class': 'logging.handlers.RotatingFileHandler',
             'filename': os.path.join(LOG_DIR, 'django.log'),
-            'formatter': 'simple',
+            'formatter': 'json' if LOG_FORMAT == 'json' else 'simple',
             'level': 'INFO',
+            'maxBytes': int(os.getenv('LOG_FILE_MAX_BYTES', 10 * 1024 * 1024)),
+            'backupCount': int(os.getenv('LOG_FILE_BACKUPS', 5)),
+            'delay': True,
         },
     },
     'loggers': {
         '': {
             'handlers': ['console', 'file'],
-            'level': 'DEBUG',
+            'level': LOG_LEVEL,
             'propagate': True,
         },
     },
 }
 
+_listener = None
+
+
 def configure_logging():
 
+    # The configured handlers move behind a queue: callers only enqueue, and a listener
+    # thread formats and writes.
+    global _listener
+    stop_logging()
+
     logging.config.dictConfig(LOGGING)
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    for handler in handlers:
+        root.removeHandler(handler)
+
+    queue_handler = AsyncQueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(SamplingFilter(parse_sample_rates(LOG_SAMPLE_RATES)))
+    root.addHandler(queue_handler)
+
+    _listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+@atexit.register
+def stop_logging():
+
+    # Flushes whatever is still queued before the interpreter exits.
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 def get_logger(name: str) -> logging.Logger:
     
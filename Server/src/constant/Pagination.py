@@ -1,6 +1,11 @@
+import base64
+from datetime import datetime
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
 from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
-from urllib.parse import urlparse
 
 
 class CustomCursorPagination(CursorPagination):
@@ -26,3 +31,94 @@ class CustomCursorPagination(CursorPagination):
                 else parsed_url.path
             )
         return None
+
+
+class LowStockCursorPagination(CustomCursorPagination):
+    # Largest shortfall first: margin is stock minus reorder level, so most negative first.
+    ordering = ('margin', 'id')
+
+
+class AsyncKeysetPagination:
+    # Cursor pagination for the async views, which DRF's paginator cannot serve because it
+    # fetches synchronously. The cursor holds the (CreatedDate, id) of the row at the page
+    # edge, so every page is one range query on the index with no offset to skip.
+    page_size = 12
+    ordering_field = 'CreatedDate'
+    cursor_query_param = 'cursor'
+
+    def __init__(self):
+        self.request = None
+        self.next_row = None
+        self.previous_row = None
+
+    def encode_cursor(self, instance, reverse):
+        token = urlencode({
+            'p': getattr(instance, self.ordering_field).isoformat(),
+            'i': str(instance.pk),
+            'r': int(reverse),
+        })
+        return base64.urlsafe_b64encode(token.encode()).decode()
+
+    def decode_cursor(self, request, queryset):
+        cursor = request.GET.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            values = parse_qs(base64.urlsafe_b64decode(cursor.encode()).decode(), strict_parsing=True)
+            position = datetime.fromisoformat(values['p'][0])
+            pk = queryset.model._meta.pk.to_python(values['i'][0])
+            reverse = values['r'][0] == '1'
+        except (KeyError, ValueError, UnicodeDecodeError, ValidationError):
+            raise ValueError("Invalid cursor")
+        return position, pk, reverse
+
+    async def paginate_queryset(self, queryset, request):
+        self.request = request
+        cursor = self.decode_cursor(request, queryset)
+        reverse = cursor is not None and cursor[2]
+        field = self.ordering_field
+
+        if reverse:
+            queryset = queryset.order_by(field, 'pk')
+        else:
+            queryset = queryset.order_by(f'-{field}', '-pk')
+        if cursor is not None:
+            position, pk = cursor[:2]
+            # The plain range on the ordering field keeps the index usable; the OR only
+            # breaks ties between rows created in the same microsecond.
+            if reverse:
+                queryset = queryset.filter(
+                    Q(**{f'{field}__gt': position}) | Q(**{field: position, 'pk__gt': pk}),
+                    **{f'{field}__gte': position},
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(**{f'{field}__lt': position}) | Q(**{field: position, 'pk__lt': pk}),
+                    **{f'{field}__lte': position},
+                )
+
+        rows = [row async for row in queryset[:self.page_size + 1]]
+        has_more = len(rows) > self.page_size
+        page = rows[:self.page_size]
+        if reverse:
+            page.reverse()
+            self.next_row = page[-1] if page else None
+            self.previous_row = page[0] if page and has_more else None
+        else:
+            self.next_row = page[-1] if has_more else None
+            self.previous_row = page[0] if page and cursor is not None else None
+        return page
+
+    def get_link(self, row, reverse):
+        if row is None:
+            return None
+        params = self.request.GET.copy()
+        params[self.cursor_query_param] = self.encode_cursor(row, reverse)
+        return f"{self.request.path}?{params.urlencode()}"
+
+    def get_paginated_data(self, data):
+        return {
+            "next": self.get_link(self.next_row, False),
+            "previous": self.get_link(self.previous_row, True),
+            "results": data,
+        }
@@ -2,14 +2,16 @@ from datetime import timedelta
 from pathlib import Path
 
 import os
+import tempfile
 from dotenv import load_dotenv
 
+load_dotenv()
+
+# Imported after load_dotenv so LOG_* variables from .env are seen.
 from src.constant.Logging import configure_logging
 
 configure_logging()
 
-load_dotenv()
-
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.getenv(
@@ -45,18 +47,34 @@ VERSATILEIMAGEFIELD_SETTINGS = {
     'sized_directory_name': '__sized__',
     'filtered_directory_name': '__filtered__',
     'placeholder_directory_name': '__placeholder__',
-    'create_images_on_demand': True,
+    # Renditions are pre-warmed off the request path by src.utils.image_renditions.
+    'create_images_on_demand': False,
     'image_key_post_processor': None,
     'progressive_jpeg': False
 }
 
+VERSATILEIMAGEFIELD_RENDITION_KEY_SETS = {
+    'product_image': [
+        ('full_size', 'url'),
+        ('thumbnail', 'thumbnail__300x300'),
+        ('card', 'crop__400x400'),
+    ],
+}
+
+IMAGE_RENDITION_WORKERS = 2
+
+PRODUCT_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+PRODUCT_IMAGE_SPOOL_BYTES = 1024 * 1024
+
 MIDDLEWARE = [
+    'src.utils.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'src.utils.db_routing.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -83,23 +101,88 @@ WSGI_APPLICATION = 'src.wsgi.application'
 AUTH_USER_MODEL = 'Usermgmt.CustomUser'
 
 
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '60'))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock up front so concurrent stock updates queue on the
+            # busy timeout instead of failing on a lock upgrade.
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+            # WAL lets the replica connection read while a writer holds the lock.
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+        },
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    },
+    # Read-only views are routed here. Locally it is a second, query-only connection to
+    # the primary file; point DB_REPLICA_NAME at a replicated copy to split the files.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('DB_REPLICA_NAME', os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3')),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 20,
+            'init_command': 'PRAGMA query_only=ON;',
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
 }
 
+DATABASE_ROUTERS = ['src.utils.db_routing.ReplicaRouter']
+REPLICA_DATABASE = 'replica'
+# How long a client keeps reading from the primary after it wrote something.
+REPLICA_PIN_SECONDS = 5
+
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'src.Usermgmt.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated', 
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'src.utils.metrics.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    # Token buckets for the password-hashing endpoints (src.Usermgmt.throttling).
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': '30/min',
+        'login_email': '10/min',
+        'register_ip': '10/hour',
+    },
 }
 
+# At most this many requests hash passwords at once; others wait up to
+# PASSWORD_HASH_WAIT_SECONDS for a slot and are then turned away with a 503.
+PASSWORD_HASH_CONCURRENCY = int(os.getenv('PASSWORD_HASH_CONCURRENCY', '2'))
+PASSWORD_HASH_WAIT_SECONDS = 1.0
+
+# Queries at or above this many milliseconds are logged with the calling view's stack.
+# Unset (the default) turns the slow query log off.
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS')) if os.getenv('SLOW_QUERY_MS') else None
+
+# /metrics answers only these client addresses, or a request carrying
+# "Authorization: Bearer <METRICS_TOKEN>" when a token is set. Behind a reverse proxy on
+# the same host every client looks like 127.0.0.1, so set METRICS_ALLOWED_IPS to empty
+# there and scrape with the token.
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()]
+METRICS_TOKEN = os.getenv('METRICS_TOKEN') or None
+
+# Authenticated users are cached in-process for this many seconds (see CachedJWTAuthentication).
+JWT_USER_CACHE_TTL = 60
+JWT_USER_CACHE_SIZE = 1024
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -139,5 +222,31 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+PRODUCT_ID_BLOCK_SIZE = 50
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'inventory-default',
+    },
+    # Catalog and ledger versions, which every worker must see: a file cache shared by the
+    # processes on one host. Across hosts, point these at Redis or Memcached.
+    'versions': {
+        'BACKEND': os.getenv('VERSION_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('VERSION_CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'inventory-versions')),
+    },
+}
+VERSION_CACHE_ALIAS = 'versions'
+
+SKU_CACHE_SIZE = 10000
+
+# 'lru' keeps serialized list pages per process; 'shared' stores them in the CACHES alias.
+PRODUCT_LIST_CACHE = {
+    'BACKEND': os.getenv('PRODUCT_LIST_CACHE_BACKEND', 'lru'),
+    'MAX_ENTRIES': 256,
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
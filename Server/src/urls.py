@@ -18,18 +18,18 @@ from django.contrib import admin
 from django.urls import path,include
 from django.conf import settings
 from django.conf.urls.static import static
+from src.utils.metrics import metrics_view
 
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from rest_framework_simplejwt.views import TokenRefreshView
+from src.Usermgmt.views import ThrottledTokenObtainPairView
 
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/token/', ThrottledTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/products/',include('src.Product.urls')),
     path('api/',include('src.Usermgmt.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]+ static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,168 @@
+import random
+import re
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, connections
+from django.utils import timezone
+
+from src.Product.models import Products, Variant, SubVariant, StockTransaction
+from src.Usermgmt.models import CustomUser
+
+
+@contextmanager
+def benchmark_database(keepdb=False):
+    
+    # Benchmarks seed a throwaway database of their own, so neither the real one nor a
+    # concurrently running test suite is touched.
+    old_name = connection.settings_dict['NAME']
+    old_test_name = connection.settings_dict['TEST'].get('NAME')
+    connection.settings_dict['TEST']['NAME'] = settings.BASE_DIR / 'benchmark_db.sqlite3'
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    mirrors = {}
+    for alias in connections:
+        if connections[alias].settings_dict['TEST'].get('MIRROR') == connection.alias:
+            mirrors[alias] = connections[alias].settings_dict['NAME']
+            connections[alias].close()
+            connections[alias].creation.set_as_test_mirror(connection.settings_dict)
+    try:
+        yield
+    finally:
+        for alias, name in mirrors.items():
+            connections[alias].close()
+            connections[alias].settings_dict['NAME'] = name
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        connection.settings_dict['TEST']['NAME'] = old_test_name
+
+
+def timed(func, *args, **kwargs):
+    
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def percentile(samples, pct):
+    
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    
+    return {
+        'count': len(samples),
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+        'max_ms': round(max(samples), 3) if samples else 0.0,
+    }
+
+
+def server_timing_queries(response):
+    
+    # MetricsMiddleware reports the request's query count in its Server-Timing header.
+    match = re.search(r'desc="(\d+) queries"', response.get('Server-Timing', ''))
+    return int(match.group(1)) if match else None
+
+
+def peak_memory_kb(func, *args, **kwargs):
+    
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+def seeded_uuids(seed):
+    
+    # Deterministic primary keys, so two runs with the same seed build the same rows.
+    rng = random.Random(seed)
+    return lambda: uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def get_benchmark_user():
+    
+    user, created = CustomUser.objects.get_or_create(email='benchmark@example.com')
+    if created:
+        user.set_password('benchmark-pass-123')
+        user.save()
+    return user
+
+
+def seed_catalog(user, products, variants=3, options=4, stock=Decimal('1000'), start_id=100000, new_id=uuid.uuid4):
+    
+    product_rows, variant_rows, option_rows = [], [], []
+    for p in range(products):
+        product_id = start_id + p
+        product = Products(
+            id=new_id(),
+            ProductID=product_id,
+            ProductCode=f'PROD-{product_id}',
+            ProductName=f'Benchmark Product {product_id}',
+            CreatedUser=user,
+            TotalStock=stock * variants * options,
+        )
+        product_rows.append(product)
+        for v in range(variants):
+            variant = Variant(id=new_id(), product=product, name=f'Variant {v}')
+            variant_rows.append(variant)
+            for o in range(options):
+                option_rows.append(SubVariant(
+                    id=new_id(),
+                    variant=variant,
+                    value=f'Option {o}',
+                    stock=stock,
+                    sku=f'BENCH-{product_id}-{v}-{o}',
+                ))
+
+    Products.objects.bulk_create(product_rows, batch_size=2000)
+    Variant.objects.bulk_create(variant_rows, batch_size=2000)
+    SubVariant.objects.bulk_create(option_rows, batch_size=2000)
+    return option_rows
+
+
+def seed_transactions(user, sub_variant_ids, count, days=90, batch_size=10000, new_id=uuid.uuid4, now=None):
+    
+    # Raw executemany so CreatedDate can be spread over a range instead of auto_now_add.
+    opts = StockTransaction._meta
+    columns = ['id', 'sub_variant', 'quantity', 'transaction_type', 'CreatedDate', 'created_by']
+    fields = [opts.get_field(name) for name in columns]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        connection.ops.quote_name(opts.db_table),
+        ', '.join(connection.ops.quote_name(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+
+    def prep(values):
+        return tuple(field.get_db_prep_save(value, connection) for field, value in zip(fields, values))
+
+    now = now or timezone.now()
+    step = timedelta(days=days) / max(count, 1)
+    quantity = Decimal('1')
+    rows = []
+    with connection.cursor() as cursor:
+        for i in range(count):
+            rows.append(prep((
+                new_id(),
+                sub_variant_ids[i % len(sub_variant_ids)],
+                quantity,
+                'IN' if i % 3 else 'OUT',
+                now - step * (count - i),
+                user.pk,
+            )))
+            if len(rows) >= batch_size:
+                cursor.executemany(sql, rows)
+                rows = []
+        if rows:
+            cursor.executemany(sql, rows)
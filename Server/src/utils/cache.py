@@ -0,0 +1,181 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+
+class LRUCache:
+    
+    # Bounded in-process cache; the least recently used entry is evicted first. With a ttl,
+    # entries also expire that many seconds after they were set.
+
+    def __init__(self, max_entries=256, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value, expires = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {'backend': 'lru', 'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+class SharedCache:
+    
+    # Stores entries in a Django cache alias (Redis/Memcached in production, LocMemCache locally)
+    # so every worker shares them; hit/miss counters stay per process.
+
+    def __init__(self, alias='default', timeout=300, prefix=''):
+        self.alias = alias
+        self.timeout = timeout
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def get(self, key):
+        value = self.backend.get(self.prefix + key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.backend.set(self.prefix + key, value, self.timeout)
+
+    def delete(self, key):
+        self.backend.delete(self.prefix + key)
+
+    def clear(self):
+        self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {'backend': 'shared', 'alias': self.alias, 'hits': self.hits, 'misses': self.misses}
+
+
+def build_cache(config, prefix):
+    
+    if config.get('BACKEND', 'lru') == 'shared':
+        return SharedCache(config.get('ALIAS', 'default'), config.get('TIMEOUT', 300), prefix)
+    return LRUCache(config.get('MAX_ENTRIES', 256))
+
+
+PRODUCT_LIST_CACHE = getattr(settings, 'PRODUCT_LIST_CACHE', {})
+VERSION_CACHE_ALIAS = getattr(settings, 'VERSION_CACHE_ALIAS', 'versions')
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+CATALOG_VERSION_KEY = 'catalog:version'
+LEDGER_VERSION_KEY = 'ledger:version'
+
+product_list_cache = build_cache(PRODUCT_LIST_CACHE, prefix='product-list:')
+
+
+def version_store():
+    
+    # Versions invalidate every worker's cached pages and ETags; kept per process, a write on
+    # one worker would leave the others serving stale pages for good.
+    store = caches[VERSION_CACHE_ALIAS]
+    if isinstance(store, PROCESS_LOCAL_BACKENDS):
+        raise ImproperlyConfigured(
+            f"CACHES['{VERSION_CACHE_ALIAS}'] must be shared by every process, not {type(store).__name__}"
+        )
+    return store
+
+
+def new_version():
+    
+    # Unique per bump, so two processes bumping at once can never write the same value and
+    # lose one of the bumps, and a version lost to eviction or restart never repeats.
+    return f'{time.time_ns()}.{uuid.uuid4().hex[:8]}'
+
+
+def get_version(key):
+    
+    store = version_store()
+    version = store.get(key)
+    if version is None:
+        store.add(key, new_version(), None)
+        version = store.get(key)
+    return version
+
+
+def bump_version(key):
+    
+    # Bump now and again once the write commits: a reader that cached pre-commit rows
+    # under the interim version is then orphaned too.
+    version_store().set(key, new_version(), None)
+    transaction.on_commit(lambda: version_store().set(key, new_version(), None))
+
+
+def catalog_version():
+    
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    
+    bump_version(CATALOG_VERSION_KEY)
+
+
+def ledger_version():
+    
+    return get_version(LEDGER_VERSION_KEY)
+
+
+def bump_ledger_version():
+    
+    # Every stock movement bumps this, so the stock report can be validated without a query.
+    bump_version(LEDGER_VERSION_KEY)
+
+
+def product_list_cache_key(request):
+    
+    # Keyed by path too: the sync and async list endpoints build different cursor links.
+    params = sorted(request.GET.lists())
+    return f"{catalog_version()}:{request.path}:{params}"
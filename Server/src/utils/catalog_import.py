@@ -0,0 +1,238 @@
+import csv
+import json
+import time
+import uuid
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from src.Product.models import Products, Variant, SubVariant
+from src.utils.cache import bump_catalog_version
+from src.utils.product import reserve_product_ids
+from src.utils.search import index_products
+from src.constant.Logging import get_logger
+
+logger = get_logger(__name__)
+
+CSV_COLUMNS = ('ProductName', 'HSNCode', 'variant', 'option', 'stock', 'sku')
+MAX_REPORTED_REJECTIONS = 1000
+
+
+class RejectedRecord(Exception):
+    pass
+
+
+def iter_jsonl_products(stream):
+    
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, RejectedRecord(f"Invalid JSON: {e}")
+
+
+def iter_csv_products(stream):
+    
+    # One row per option; consecutive rows with the same ProductName form one product.
+    reader = csv.DictReader(stream)
+    missing = set(CSV_COLUMNS) - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"Missing CSV columns: {', '.join(sorted(missing))}")
+
+    current, start_line = None, None
+    for line_number, row in enumerate(reader, start=2):
+        if current is None or row['ProductName'] != current['ProductName']:
+            if current is not None:
+                yield start_line, current
+            current, start_line = {'ProductName': row['ProductName'], 'HSNCode': row['HSNCode'], 'variants': []}, line_number
+
+        variants = current['variants']
+        if not variants or variants[-1]['name'] != row['variant']:
+            variants.append({'name': row['variant'], 'options': []})
+        variants[-1]['options'].append({'value': row['option'], 'stock': row['stock'], 'sku': row['sku']})
+
+    if current is not None:
+        yield start_line, current
+
+
+def clean_text(value, model, field_name, label, required=False):
+    
+    if value is None:
+        value = ''
+    if not isinstance(value, str):
+        raise RejectedRecord(f"{label} must be a string")
+    value = value.strip()
+    if required and not value:
+        raise RejectedRecord(f"{label} is required")
+    max_length = model._meta.get_field(field_name).max_length
+    if len(value) > max_length:
+        raise RejectedRecord(f"{label} is longer than {max_length} characters")
+    return value
+
+
+def clean_stock(value):
+    
+    if isinstance(value, bool) or not isinstance(value, (int, float, str, type(None))):
+        raise RejectedRecord(f"Invalid stock: {value}")
+    try:
+        stock = Decimal(str(value or 0))
+    except InvalidOperation:
+        raise RejectedRecord(f"Invalid stock: {value}")
+    if not stock.is_finite():
+        raise RejectedRecord(f"Invalid stock: {value}")
+    if stock < 0:
+        raise RejectedRecord("Stock cannot be negative")
+    # The column's own digit limits, checked here so the chunk's bulk insert never fails on them.
+    try:
+        for validator in SubVariant._meta.get_field('stock').validators:
+            validator(stock)
+    except ValidationError as e:
+        raise RejectedRecord(f"Invalid stock {value}: {' '.join(e.messages)}")
+    return stock
+
+
+def clean_list(value, label):
+    
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(item, dict) for item in value):
+        raise RejectedRecord(f"{label} must be a list of objects")
+    return value
+
+
+def clean_product(record):
+    
+    # Every shape or value problem becomes a RejectedRecord for this row; nothing may raise
+    # later inside the chunk's transaction and take the rest of the import down with it.
+    if isinstance(record, RejectedRecord):
+        raise record
+    if not isinstance(record, dict):
+        raise RejectedRecord("Expected an object")
+
+    name = clean_text(record.get('ProductName'), Products, 'ProductName', "ProductName", required=True)
+    hsn_code = clean_text(record.get('HSNCode'), Products, 'HSNCode', "HSNCode")
+
+    variants = []
+    for variant in clean_list(record.get('variants'), "variants"):
+        variant_name = clean_text(variant.get('name'), Variant, 'name', "Variant name", required=True)
+        options = []
+        for option in clean_list(variant.get('options'), "options"):
+            options.append({
+                'value': clean_text(option.get('value'), SubVariant, 'value', "Option value"),
+                'stock': clean_stock(option.get('stock')),
+                'sku': clean_text(option.get('sku'), SubVariant, 'sku', "SKU") or f"SKU-{uuid.uuid4().hex[:8]}",
+            })
+        variants.append({'name': variant_name, 'options': options})
+
+    return {'ProductName': name, 'HSNCode': hsn_code or None, 'variants': variants}
+
+
+def import_chunk(chunk, user, report):
+    
+    cleaned = []
+    for line_number, record in chunk:
+        try:
+            cleaned.append((line_number, clean_product(record)))
+        except RejectedRecord as e:
+            report.reject(line_number, str(e))
+
+    # Drop products whose SKUs collide with each other or with the catalog, in one lookup.
+    skus = [o['sku'] for _, p in cleaned for v in p['variants'] for o in v['options']]
+    taken = set(SubVariant.objects.filter(sku__in=skus).values_list('sku', flat=True))
+    accepted = []
+    for line_number, product in cleaned:
+        product_skus = [o['sku'] for v in product['variants'] for o in v['options']]
+        clash = (
+            next((sku for sku in product_skus if sku in taken), None)
+            or next((sku for sku, count in Counter(product_skus).items() if count > 1), None)
+        )
+        if clash:
+            report.reject(line_number, f"Duplicate SKU: {clash}")
+            continue
+        taken.update(product_skus)
+        accepted.append(product)
+
+    if not accepted:
+        return
+
+    product_rows, variant_rows, option_rows = [], [], []
+    with transaction.atomic():
+        for product_id, product in zip(reserve_product_ids(len(accepted)), accepted):
+            total_stock = sum((o['stock'] for v in product['variants'] for o in v['options']), Decimal('0'))
+            product_row = Products(
+                ProductID=product_id,
+                ProductCode=f'PROD-{product_id}',
+                ProductName=product['ProductName'],
+                HSNCode=product['HSNCode'],
+                CreatedUser=user,
+                TotalStock=total_stock,
+            )
+            product_rows.append(product_row)
+            for variant in product['variants']:
+                variant_row = Variant(product=product_row, name=variant['name'])
+                variant_rows.append(variant_row)
+                option_rows.extend(SubVariant(variant=variant_row, **option) for option in variant['options'])
+
+        Products.objects.bulk_create(product_rows, batch_size=500)
+        Variant.objects.bulk_create(variant_rows, batch_size=500)
+        SubVariant.objects.bulk_create(option_rows, batch_size=500)
+        index_products([product.id for product in product_rows])
+        bump_catalog_version()
+
+    report.products += len(product_rows)
+    report.variants += len(variant_rows)
+    report.options += len(option_rows)
+
+
+class ImportReport:
+
+    def __init__(self):
+        self.products = 0
+        self.variants = 0
+        self.options = 0
+        self.rejected_count = 0
+        self.rejected = []
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    def reject(self, line_number, error):
+        self.rejected_count += 1
+        if len(self.rejected) < MAX_REPORTED_REJECTIONS:
+            self.rejected.append({'line': line_number, 'error': error})
+
+    def as_dict(self):
+        return {
+            'products': self.products,
+            'variants': self.variants,
+            'options': self.options,
+            'seconds': round(self.seconds, 3),
+            'products_per_second': round(self.products / self.seconds, 1) if self.seconds else 0.0,
+            'rejected_count': self.rejected_count,
+            'rejected': self.rejected,
+        }
+
+
+def import_products(stream, file_format, user, chunk_size=1000):
+    
+    # Reads the stream record by record and writes in chunks, so memory is bounded by chunk_size.
+    records = iter_csv_products(stream) if file_format == 'csv' else iter_jsonl_products(stream)
+    report = ImportReport()
+
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+        import_chunk(chunk, user, report)
+
+    report.seconds = time.perf_counter() - report.started
+    logger.info(
+        "Imported %d products (%d options) in %.2fs, %d rejected",
+        report.products, report.options, report.seconds, report.rejected_count,
+    )
+    return report
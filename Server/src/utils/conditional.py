@@ -0,0 +1,34 @@
+import hashlib
+
+from src.utils.cache import catalog_version, ledger_version
+from src.utils.stock_export import date_range_filters
+
+
+def make_etag(*parts):
+
+    return hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def product_list_etag(request, *args, **kwargs):
+
+    # Every product, variant, option and stock write bumps the catalog version, so the
+    # version plus the query string identifies a page without touching the database.
+    return make_etag('products', catalog_version(), sorted(request.GET.lists()))
+
+
+def stock_report_filters(request):
+
+    try:
+        return date_range_filters(request.GET.get('start_date'), request.GET.get('end_date'))
+    except ValueError:
+        return None
+
+
+def stock_report_etag(request, *args, **kwargs):
+
+    if stock_report_filters(request) is None:
+        return None
+    # Every stock movement bumps the ledger version and the catalog version covers renamed
+    # products and variants shown in the rows, so a poll costs no query at all. There is
+    # no Last-Modified: at one-second resolution it would hide writes in the same second.
+    return make_etag('stock', catalog_version(), ledger_version(), sorted(request.GET.lists()))
@@ -0,0 +1,108 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from src.utils.middleware import RequestContextMiddleware
+
+PIN_COOKIE = 'pin_primary'
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RoutingState:
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.use_replica = False
+        self.wrote = False
+
+
+_routing = ContextVar('db_routing', default=None)
+
+
+def replica_alias():
+
+    alias = getattr(settings, 'REPLICA_DATABASE', None)
+    return alias if alias in settings.DATABASES else None
+
+
+def pin_seconds():
+
+    return getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+
+
+@contextmanager
+def replica_reads(pinned=False):
+
+    # Routes reads in the block to the replica until something is written.
+    state = RoutingState(pinned=pinned)
+    state.use_replica = True
+    token = _routing.set(state)
+    try:
+        yield state
+    finally:
+        _routing.reset(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+
+        state = _routing.get()
+        if state is None or not state.use_replica or state.pinned or state.wrote:
+            return None
+        # Inside a transaction on the primary the replica cannot see its uncommitted rows.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return replica_alias()
+
+    def db_for_write(self, model, **hints):
+
+        state = _routing.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+
+        databases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+
+        # The replica is a copy of the primary, never migrated on its own.
+        return db != replica_alias()
+
+
+class ReplicaRoutingMiddleware(RequestContextMiddleware):
+
+    # Views opt in with `read_from_replica = True`. A request that writes reads its own
+    # writes from the primary for the rest of the request, and the pin cookie keeps the
+    # client there for REPLICA_PIN_SECONDS so a stale replica never hides them.
+
+    context = _routing
+
+    def new_state(self, request):
+        return RoutingState(pinned=PIN_COOKIE in request.COOKIES)
+
+    def finish(self, request, response, state):
+        if state.wrote:
+            response.set_cookie(PIN_COOKIE, '1', max_age=pin_seconds(), httponly=True, samesite='Lax')
+        if response.streaming and state.use_replica and not state.wrote:
+            response.streaming_content = self.stream_from_replica(response.streaming_content, state.pinned)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if request.method in READ_METHODS and getattr(view_class, 'read_from_replica', False):
+            _routing.get().use_replica = True
+
+    @staticmethod
+    def stream_from_replica(content, pinned):
+
+        # Streamed bodies are produced after the middleware returns, so route them again.
+        with replica_reads(pinned=pinned):
+            yield from content
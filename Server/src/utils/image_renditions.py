@@ -0,0 +1,115 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.utils import timezone
+from versatileimagefield.image_warmer import VersatileImageFieldWarmer
+
+from src.Product.models import Products
+from src.constant.Logging import get_logger
+
+logger = get_logger(__name__)
+
+RENDITION_KEY_SET = 'product_image'
+
+
+class RenditionQueue:
+    
+    # Generates the configured ProductImage renditions on a worker pool so no request
+    # ever resizes an image inline. Failed jobs are retried with a growing delay.
+
+    def __init__(self, workers=2, max_attempts=3, retry_delay=5.0, history=1000):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.history = history
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='renditions')
+        return self._executor
+
+    def submit(self, product_id, attempt=1):
+        
+        with self._lock:
+            self._jobs[product_id] = {
+                'status': 'pending',
+                'attempts': attempt - 1,
+                'error': None,
+                'updated': timezone.now(),
+            }
+            self._jobs.move_to_end(product_id)
+            self._trim()
+        self.executor.submit(self._run, product_id, attempt)
+
+    def _trim(self):
+        
+        # Forget the oldest finished jobs; pending and running ones are always kept.
+        finished = [key for key, job in self._jobs.items() if job['status'] in ('done', 'failed')]
+        for key in finished[:max(0, len(self._jobs) - self.history)]:
+            del self._jobs[key]
+
+    def _update(self, product_id, **fields):
+        with self._lock:
+            job = self._jobs.setdefault(product_id, {'attempts': 0, 'error': None})
+            job.update(fields, updated=timezone.now())
+
+    def _run(self, product_id, attempt):
+        
+        close_old_connections()
+        self._update(product_id, status='running', attempts=attempt)
+        try:
+            created, failed = warm_product_image(product_id)
+        except Exception as e:
+            created, failed = 0, [str(e)]
+        finally:
+            # Workers idle between jobs, so persistent connections would only hold files open.
+            connections.close_all()
+
+        if not failed:
+            self._update(product_id, status='done', created=created, error=None)
+            return
+
+        logger.warning("Rendition attempt %d failed for product %s: %s", attempt, product_id, failed)
+        if attempt >= self.max_attempts:
+            self._update(product_id, status='failed', error=failed)
+            return
+
+        self._update(product_id, status='retrying', error=failed)
+        timer = threading.Timer(self.retry_delay * attempt, self.submit, args=(product_id, attempt + 1))
+        timer.daemon = True
+        timer.start()
+
+    def status(self, product_id):
+        with self._lock:
+            job = self._jobs.get(product_id)
+            return dict(job) if job else None
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+            return counts
+
+
+def warm_product_image(product_id):
+    
+    product = Products.objects.only('id', 'ProductImage').get(id=product_id)
+    if not product.ProductImage:
+        return 0, []
+    warmer = VersatileImageFieldWarmer(
+        instance_or_queryset=product,
+        rendition_key_set=RENDITION_KEY_SET,
+        image_attr='ProductImage',
+    )
+    return warmer.warm()
+
+
+renditions = RenditionQueue(workers=getattr(settings, 'IMAGE_RENDITION_WORKERS', 2))
@@ -1,25 +1,135 @@
 import base64
-import io
-import sys
-from django.core.files.uploadedfile import InMemoryUploadedFile
+import binascii
+import tempfile
 
-def decode_base64_image(image_data: str, field_name="ProductImage") -> InMemoryUploadedFile | None:
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+IMAGE_SIGNATURES = {
+    'png': (b'\x89PNG\r\n\x1a\n',),
+    'jpeg': (b'\xff\xd8\xff',),
+    'gif': (b'GIF87a', b'GIF89a'),
+    'webp': (b'RIFF',),
+}
+IMAGE_FIELD = 'ProductImage'
+DECODE_CHUNK = 64 * 1024  # multiple of 4 so every base64 slice decodes on its own
+HEADER_LIMIT = 64
+
+
+class InvalidImage(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = 'Invalid image'
+    default_code = 'invalid_image'
+
+
+class ImageTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_code = 'image_too_large'
+
+    def __init__(self, max_bytes=None):
+        max_bytes = max_bytes or image_max_bytes()
+        super().__init__(f'Image exceeds the {max_bytes} byte limit')
+
+
+def image_max_bytes():
+    return getattr(settings, 'PRODUCT_IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+
+
+def image_spool_bytes():
+    return getattr(settings, 'PRODUCT_IMAGE_SPOOL_BYTES', 1024 * 1024)
+
+
+def detect_image_type(header: bytes) -> str | None:
+
+    for ext, signatures in IMAGE_SIGNATURES.items():
+        if header.startswith(signatures):
+            if ext == 'webp' and header[8:12] != b'WEBP':
+                continue
+            return ext
+    return None
+
+
+def decode_base64_image(image_data: str, field_name=IMAGE_FIELD, max_bytes=None) -> UploadedFile | None:
+
+    # Decodes a data URI slice by slice into a spooled temp file: the size limit is checked
+    # from the encoded length before decoding and the magic bytes from the first slice.
     if not image_data or not image_data.startswith("data:image"):
         return None
 
+    max_bytes = max_bytes or image_max_bytes()
+    marker = image_data.find(";base64,", 0, HEADER_LIMIT)
+    if marker == -1:
+        raise InvalidImage("Image must be a base64 data URI")
+
+    start = marker + len(";base64,")
+    encoded_length = len(image_data) - start
+    if encoded_length * 3 // 4 - 2 > max_bytes:
+        raise ImageTooLarge(max_bytes)
+
+    spooled = tempfile.SpooledTemporaryFile(max_size=image_spool_bytes())
+    size = 0
+    ext = None
     try:
-        format, imgstr = image_data.split(";base64,")
-        ext = format.split("/")[-1]
-        image_bytes = base64.b64decode(imgstr)
-        image_io = io.BytesIO(image_bytes)
-        image_file = InMemoryUploadedFile(
-            file=image_io,
-            field_name=field_name,
-            name=f"{field_name.lower()}.{ext}",
-            content_type=f"image/{ext}",
-            size=sys.getsizeof(image_bytes),
-            charset=None,
-        )
-        return image_file
-    except Exception as e:
-        return None 
+        for offset in range(start, len(image_data), DECODE_CHUNK):
+            chunk = base64.b64decode(image_data[offset:offset + DECODE_CHUNK], validate=True)
+            if ext is None:
+                ext = detect_image_type(chunk)
+                if ext is None:
+                    raise InvalidImage("Unsupported or corrupt image")
+            size += len(chunk)
+            spooled.write(chunk)
+    except binascii.Error:
+        spooled.close()
+        raise InvalidImage("Image is not valid base64")
+    except InvalidImage:
+        spooled.close()
+        raise
+
+    if size > max_bytes:
+        spooled.close()
+        raise ImageTooLarge(max_bytes)
+
+    spooled.seek(0)
+    return UploadedFile(
+        file=spooled,
+        name=f"{field_name.lower()}.{ext}",
+        content_type=f"image/{ext}",
+        size=size,
+        charset=None,
+    )
+
+
+class LimitedImageUploadHandler(FileUploadHandler):
+
+    # Runs ahead of Django's memory/temp-file handlers for multipart uploads: rejects the
+    # request from Content-Length, then aborts mid-stream once the image passes the limit
+    # and checks the image's magic bytes on its first chunk.
+
+    def __init__(self, request=None, max_bytes=None):
+        super().__init__(request)
+        self.max_bytes = max_bytes or image_max_bytes()
+        self.received = 0
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length and content_length > self.max_bytes + DECODE_CHUNK:
+            raise ImageTooLarge(self.max_bytes)
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.field_name != IMAGE_FIELD:
+            return raw_data
+        if start == 0 and detect_image_type(raw_data[:HEADER_LIMIT]) is None:
+            raise InvalidImage("Unsupported or corrupt image")
+        self.received += len(raw_data)
+        if self.received > self.max_bytes:
+            raise ImageTooLarge(self.max_bytes)
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
@@ -0,0 +1,204 @@
+import hmac
+import threading
+import time
+import traceback
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from rest_framework.renderers import JSONRenderer
+
+from src.constant.Logging import get_logger
+from src.utils.middleware import RequestContextMiddleware
+
+slow_query_logger = get_logger('src.slow_query')
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+STACK_LIMIT = 8
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self.view = 'unresolved'
+        self.queries = 0
+        self.db_time = 0.0
+        self.sections = {}
+        self.started = time.perf_counter()
+
+    def add_section(self, name, seconds):
+        self.sections[name] = self.sections.get(name, 0.0) + seconds
+
+
+_current = ContextVar('request_metrics', default=None)
+
+
+@contextmanager
+def section(name):
+
+    # Times a named part of the request (e.g. serialize) for Server-Timing and /metrics.
+    metrics = _current.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            metrics.add_section(name, time.perf_counter() - start)
+
+
+class Histogram:
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels, value):
+        counts, total = self.series.get(labels, ([0] * (len(self.buckets) + 1), 0.0))
+        counts[bisect_left(self.buckets, value)] += 1
+        self.series[labels] = (counts, total + value)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total) in sorted(self.series.items()):
+            label_text = ','.join(f'{key}="{value}"' for key, value in labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{label_text}}} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {
+                'total': Histogram('http_request_duration_seconds', 'Request latency by view.', LATENCY_BUCKETS),
+                'db': Histogram('http_request_db_seconds', 'Time spent in SQL by view.', LATENCY_BUCKETS),
+                'queries': Histogram('http_request_db_queries', 'SQL queries per request by view.', QUERY_BUCKETS),
+            }
+
+    def observe(self, view, method, metrics, total):
+        labels = (('method', method), ('view', view))
+        with self._lock:
+            self.histograms['total'].observe(labels, total)
+            self.histograms['db'].observe(labels, metrics.db_time)
+            self.histograms['queries'].observe(labels, metrics.queries)
+            for name, seconds in metrics.sections.items():
+                histogram = self.histograms.get(name)
+                if histogram is None:
+                    histogram = self.histograms[name] = Histogram(
+                        f'http_request_{name}_seconds', f'Time spent in {name} by view.', LATENCY_BUCKETS,
+                    )
+                histogram.observe(labels, seconds)
+
+    def render(self):
+        with self._lock:
+            lines = [line for histogram in self.histograms.values() for line in histogram.render()]
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def slow_query_ms():
+
+    return getattr(settings, 'SLOW_QUERY_MS', None)
+
+
+def calling_frames():
+
+    # The project frames that led to the query, innermost last.
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(str(settings.BASE_DIR)) and frame.filename != __file__
+    ]
+    return ''.join(traceback.format_list(frames[-STACK_LIMIT:]))
+
+
+def time_queries(execute, sql, params, many, context):
+
+    # Installed once on every connection; counts against whichever request is current in
+    # this context, so it also sees the queries the async ORM runs in its worker thread.
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.queries += 1
+        metrics.db_time += elapsed
+        threshold_ms = slow_query_ms()
+        if threshold_ms is not None and elapsed * 1000 >= threshold_ms:
+            slow_query_logger.warning(
+                "Slow query in %s (%.1fms): %s\n%s", metrics.view, elapsed * 1000, sql, calling_frames(),
+            )
+
+
+def install_query_timer(connection):
+
+    if time_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_queries)
+
+
+class MetricsMiddleware(RequestContextMiddleware):
+
+    # Counts queries and DB time on every connection this request touches, adds a
+    # Server-Timing header and feeds the per-view histograms served at /metrics.
+
+    context = _current
+
+    def new_state(self, request):
+        return RequestMetrics()
+
+    def finish(self, request, response, metrics):
+        total = time.perf_counter() - metrics.started
+        registry.observe(metrics.view, request.method, metrics, total)
+        timings = [f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries"']
+        timings += [f'{name};dur={seconds * 1000:.2f}' for name, seconds in metrics.sections.items()]
+        timings.append(f'total;dur={total * 1000:.2f}')
+        response['Server-Timing'] = ', '.join(timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current.get()
+        if metrics is not None:
+            view_class = getattr(view_func, 'view_class', None)
+            metrics.view = (view_class or view_func).__name__
+
+
+class TimedJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with section('render'):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+def metrics_allowed(request):
+
+    # Prometheus scrapes from inside the network; everyone else needs the token.
+    if request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICS_ALLOWED_IPS', ()):
+        return True
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    scheme, _, credentials = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    return bool(token) and scheme.lower() == 'bearer' and hmac.compare_digest(credentials.encode(), token.encode())
+
+
+def metrics_view(request):
+
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,51 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+
+class RequestContextMiddleware:
+
+    # Sets a per-request state object in `context` around the rest of the stack, on sync and
+    # async stacks alike. Subclasses provide `context`, `new_state(request)`, `finish(request,
+    # response, state)` and optionally `process_view`.
+
+    sync_capable = True
+    async_capable = True
+    context = None
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Django runs a sync hook in a worker thread on every async request.
+            if hasattr(type(self), 'process_view'):
+                self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = self.new_state(request)
+        token = self.context.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.context.reset(token)
+        return self.finish(request, response, state)
+
+    async def __acall__(self, request):
+        # The async ORM runs queries in a worker thread with a copy of this context, so code
+        # there sees the same state object.
+        state = self.new_state(request)
+        token = self.context.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.context.reset(token)
+        return self.finish(request, response, state)
+
+    def new_state(self, request):
+        raise NotImplementedError
+
+    def finish(self, request, response, state):
+        return response
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        return type(self).process_view(self, request, view_func, view_args, view_kwargs)
@@ -1,8 +1,89 @@
-from src.Product.models import Products
+from django.conf import settings
+from django.db.models import Prefetch
+
+from src.Product.models import Products, Variant, SubVariant
+from src.utils.sequence import SequenceAllocator
+
+def first_product_id():
+    
+    last_product = Products.objects.order_by('-ProductID').only('ProductID').first()
+    return (last_product.ProductID + 1) if last_product else 1000
+
+
+product_ids = SequenceAllocator(
+    'ProductID', initial=first_product_id, block_size=getattr(settings, 'PRODUCT_ID_BLOCK_SIZE', 50),
+)
+
 
 def generate_product_id_and_code():
     
-    last_product = Products.objects.order_by('-ProductID').first()
-    product_id = (last_product.ProductID + 1) if last_product else 1000
+    product_id = product_ids.next()
     product_code = f'PROD-{product_id}'
-    return product_id, product_code
\ No newline at end of file
+    return product_id, product_code
+
+
+# Serializer field -> model column it reads; `?fields=` may only name these.
+PRODUCT_FIELD_COLUMNS = {
+    'id': 'id',
+    'ProductID': 'ProductID',
+    'ProductCode': 'ProductCode',
+    'ProductName': 'ProductName',
+    'HSNCode': 'HSNCode',
+    'IsFavourite': 'IsFavourite',
+    'TotalStock': 'TotalStock',
+    'ProductImage': 'ProductImage',
+    'ProductImageRenditions': 'ProductImage',
+    'CreatedDate': 'CreatedDate',
+    'UpdatedDate': 'UpdatedDate',
+    'CreatedUser': 'CreatedUser',
+}
+PRODUCT_INCLUDES = ('variants',)
+
+
+def split_param(value):
+
+    return list(dict.fromkeys(name.strip() for name in (value or '').split(',') if name.strip()))
+
+
+def parse_product_fields(query_params, allowed=PRODUCT_FIELD_COLUMNS, includes=PRODUCT_INCLUDES):
+    
+    # `?fields=` narrows the flat fields (id is always kept); nested relations are only sent
+    # when no fields were asked for, or when named in `?include=`.
+    fields = split_param(query_params.get('fields'))
+    included = split_param(query_params.get('include'))
+
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    unknown = [name for name in included if name not in includes]
+    if unknown:
+        raise ValueError(f"Unknown include: {', '.join(unknown)}")
+
+    if not fields:
+        return None, set(includes)
+    return ['id'] + [name for name in fields if name != 'id'], set(included)
+
+
+def get_product_list_queryset(fields=None, include_variants=True):
+    
+    queryset = Products.objects.filter(Active=True).order_by('-CreatedDate')
+    if fields is not None:
+        # CreatedDate stays loaded because the cursor paginator reads it for its links.
+        columns = {PRODUCT_FIELD_COLUMNS[name] for name in fields} | {'id', 'CreatedDate'}
+        queryset = queryset.only(*columns)
+    if not include_variants:
+        return queryset
+
+    # Loads the product -> variants -> options tree in three queries, whatever the page size.
+    options = SubVariant.objects.only('id', 'variant_id', 'value', 'stock', 'reorder_level').order_by('CreatedDate', 'id')
+    variants = (
+        Variant.objects.only('id', 'product_id', 'name')
+        .order_by('CreatedDate', 'id')
+        .prefetch_related(Prefetch('options', queryset=options))
+    )
+    return queryset.prefetch_related(Prefetch('variants', queryset=variants))
+
+
+def reserve_product_ids(count):
+    
+    return product_ids.reserve(count)
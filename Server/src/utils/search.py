@@ -0,0 +1,142 @@
+import base64
+import re
+import threading
+
+from django.db import connection, transaction
+
+from src.Product.models import Products
+
+SEARCH_TABLE = 'products_search'
+MAX_QUERY_TOKENS = 8
+# bm25 column weights: product_id (unindexed), name, code, hsn, skus
+RANK = f'bm25({SEARCH_TABLE}, 0.0, 10.0, 6.0, 2.0, 4.0)'
+
+INDEX_SQL = f'''
+    INSERT INTO {SEARCH_TABLE} (product_id, name, code, hsn, skus)
+    SELECT p.id, p."ProductName", p."ProductCode", COALESCE(p."HSNCode", ''), COALESCE(GROUP_CONCAT(s.sku, ' '), '')
+    FROM products_product p
+    LEFT JOIN products_variant v ON v.product_id = p.id
+    LEFT JOIN products_subvariant s ON s.variant_id = v.id
+    WHERE p."Active" {{where}}
+    GROUP BY p.id
+'''
+
+_pending = threading.local()
+
+
+def search_enabled():
+    
+    return connection.vendor == 'sqlite'
+
+
+def _db_ids(product_ids):
+    
+    field = Products._meta.pk
+    return [field.get_db_prep_value(pk, connection) for pk in product_ids]
+
+
+def index_products(product_ids):
+    
+    if not product_ids or not search_enabled():
+        return
+    ids = _db_ids(product_ids)
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE product_id IN ({placeholders})', batch)
+            cursor.execute(INDEX_SQL.format(where=f'AND p.id IN ({placeholders})'), batch)
+
+
+def remove_products(product_ids):
+    
+    if not product_ids or not search_enabled():
+        return
+    ids = _db_ids(product_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE product_id IN ({", ".join(["%s"] * len(ids))})', ids)
+
+
+def rebuild_index():
+    
+    if not search_enabled():
+        return 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(INDEX_SQL.format(where=''))
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+        cursor.execute(f'SELECT COUNT(*) FROM {SEARCH_TABLE}')
+        return cursor.fetchone()[0]
+
+
+def schedule_index(product_id):
+    
+    # Coalesces every change in one transaction into a single reindex after commit; the
+    # later callbacks find the set empty. Ids left by a rolled-back transaction are simply
+    # reindexed with the next flush, which always reflects what is in the database.
+    pending = getattr(_pending, 'ids', None)
+    if pending is None:
+        pending = _pending.ids = set()
+    pending.add(product_id)
+    transaction.on_commit(_flush)
+
+
+def _flush():
+    
+    ids, _pending.ids = getattr(_pending, 'ids', set()), set()
+    if ids:
+        index_products(list(ids))
+
+
+def build_match(query):
+    
+    # Every token becomes a quoted prefix term, so user input can never inject FTS syntax.
+    tokens = re.findall(r'\w+', query.lower())[:MAX_QUERY_TOKENS]
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def encode_cursor(offset):
+    return base64.urlsafe_b64encode(f'o={offset}'.encode()).decode()
+
+
+def decode_cursor(cursor):
+    
+    if not cursor:
+        return 0
+    try:
+        key, value = base64.urlsafe_b64decode(cursor.encode()).decode().split('=', 1)
+        if key != 'o' or int(value) < 0:
+            raise ValueError
+        return int(value)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def search_product_ids(query, offset=0, limit=12):
+    
+    # Returns up to `limit` (product_id, score) pairs best-first and whether more exist.
+    match = build_match(query)
+    if not match:
+        return [], False
+
+    if search_enabled():
+        with connection.cursor() as cursor:
+            # Scored and ordered inside the MATCH query, so the best hits win wherever they sit in
+            # the table; with a LIMIT SQLite sorts into a bounded top-N rather than the full set.
+            cursor.execute(
+                f'SELECT product_id, {RANK} AS score FROM {SEARCH_TABLE} '
+                f'WHERE {SEARCH_TABLE} MATCH %s ORDER BY score, rowid LIMIT %s OFFSET %s',
+                [match, limit + 1, offset],
+            )
+            rows = cursor.fetchall()
+        to_python = Products._meta.pk.to_python
+        rows = [(to_python(product_id), score) for product_id, score in rows]
+    else:
+        prefix = query.strip()
+        rows = [
+            (product_id, 0.0)
+            for product_id in Products.objects.filter(Active=True, ProductName__istartswith=prefix)
+            .order_by('ProductName', 'id').values_list('id', flat=True)[offset:offset + limit + 1]
+        ]
+
+    return rows[:limit], len(rows) > limit
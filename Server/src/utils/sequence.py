@@ -0,0 +1,42 @@
+import os
+import threading
+
+from django.db import transaction
+from django.db.models import F
+
+from src.Product.models import Sequence
+
+
+class SequenceAllocator:
+    
+    # Reserves values from a counter row in blocks and hands them out from memory,
+    # so most allocations skip the database and no two workers share a value.
+    # Values reserved but never used (e.g. an abandoned preview) are skipped, not reused.
+
+    def __init__(self, name, initial, block_size=50):
+        self.name = name
+        self.initial = initial
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+        self._pid = None
+
+    def reserve(self, count):
+        
+        with transaction.atomic():
+            Sequence.objects.get_or_create(name=self.name, defaults={'value': self.initial()})
+            Sequence.objects.filter(name=self.name).update(value=F('value') + count)
+            end = Sequence.objects.values_list('value', flat=True).get(name=self.name)
+        return range(end - count, end)
+
+    def next(self):
+        
+        with self._lock:
+            # A forked worker must not keep handing out its parent's block.
+            if self._pid != os.getpid() or self._next >= self._end:
+                block = self.reserve(self.block_size)
+                self._next, self._end, self._pid = block.start, block.stop, os.getpid()
+            value = self._next
+            self._next += 1
+            return value
@@ -0,0 +1,88 @@
+from django.conf import settings
+
+from src.Product.models import SubVariant
+from src.utils.cache import LRUCache
+
+IDENTITY_FIELDS = {
+    'sub_variant_id': 'id',
+    'sku': 'sku',
+    'option_value': 'value',
+    'variant_id': 'variant_id',
+    'variant_name': 'variant__name',
+    'product_id': 'variant__product_id',
+    'ProductID': 'variant__product__ProductID',
+    'ProductCode': 'variant__product__ProductCode',
+    'ProductName': 'variant__product__ProductName',
+}
+
+# SKU -> identity of its option; stock is never cached and is read fresh on every scan.
+sku_cache = LRUCache(max_entries=getattr(settings, 'SKU_CACHE_SIZE', 10000))
+
+
+def cached_identities(skus):
+
+    cached = {}
+    for sku in dict.fromkeys(skus):
+        identity = sku_cache.get(sku)
+        if identity is not None:
+            cached[identity['sub_variant_id']] = identity
+    return cached
+
+
+def fresh_stock(cached):
+
+    return SubVariant.objects.filter(id__in=list(cached)).values_list('id', 'sku', 'stock')
+
+
+def merge_fresh_stock(cached, rows, results):
+
+    # The fresh query also re-checks the SKU, so a renamed or deleted option is never
+    # answered from a stale entry.
+    for pk, sku, stock in rows:
+        identity = cached[pk]
+        if identity['sku'] == sku:
+            results[sku] = {**identity, 'stock': stock}
+    for identity in cached.values():
+        if identity['sku'] not in results:
+            sku_cache.delete(identity['sku'])
+
+
+def identities(missing):
+
+    return SubVariant.objects.filter(sku__in=missing).values('stock', *IDENTITY_FIELDS.values())
+
+
+def merge_identities(rows, results):
+
+    for row in rows:
+        identity = {name: row[field] for name, field in IDENTITY_FIELDS.items()}
+        sku_cache.set(identity['sku'], identity)
+        results[identity['sku']] = {**identity, 'stock': row['stock']}
+
+
+def lookup_skus(skus):
+    
+    # Hot SKUs cost one primary-key query for stock; misses add one joined query.
+    results = {}
+    cached = cached_identities(skus)
+    if cached:
+        merge_fresh_stock(cached, fresh_stock(cached), results)
+
+    missing = [sku for sku in dict.fromkeys(skus) if sku not in results]
+    if missing:
+        merge_identities(identities(missing), results)
+    return results
+
+
+async def alookup_skus(skus):
+
+    # lookup_skus() through the async ORM: same queries, same cache.
+    results = {}
+    cached = cached_identities(skus)
+    if cached:
+        merge_fresh_stock(cached, [row async for row in fresh_stock(cached)], results)
+
+    missing = [sku for sku in dict.fromkeys(skus) if sku not in results]
+    if missing:
+        merge_identities([row async for row in identities(missing)], results)
+    return results
@@ -0,0 +1,158 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework import serializers
+
+from src.Product.models import Products, StockAlert, SubVariant, StockTransaction
+from src.utils.cache import bump_catalog_version, bump_ledger_version
+from src.utils.stock_alerts import level_alert, stock_alert
+from src.utils.stock_rollup import record_rollup, rollup_day
+
+
+def stock_delta(quantity, transaction_type):
+    
+    return quantity if transaction_type == 'IN' else -quantity
+
+
+def apply_stock_movement(sub_variant, quantity, transaction_type, user):
+    
+    # One transaction: a guarded UPDATE on the option, an expression UPDATE on the
+    # product total and the ledger insert, so concurrent scanners never lose updates.
+    # The OUT guard only holds for positive quantities; a negative one would flip the direction.
+    if quantity <= 0:
+        raise serializers.ValidationError("Quantity must be positive")
+    delta = stock_delta(quantity, transaction_type)
+
+    with transaction.atomic():
+        options = SubVariant.objects.filter(id=sub_variant.id)
+        if transaction_type == 'OUT':
+            options = options.filter(stock__gte=quantity)
+        if not options.update(stock=F('stock') + delta):
+            raise serializers.ValidationError("Insufficient stock")
+
+        # Read back inside the transaction: the row is locked, so this is the stock our
+        # update produced and stock - delta is what it replaced.
+        stock, reorder_level = SubVariant.objects.filter(id=sub_variant.id).values_list('stock', 'reorder_level').get()
+        alert = stock_alert(sub_variant.id, stock - delta, stock, reorder_level)
+        if alert is not None:
+            alert.save()
+
+        Products.objects.filter(id=sub_variant.variant.product_id).update(
+            TotalStock=Coalesce(F('TotalStock'), Value(0)) + delta,
+            UpdatedDate=timezone.now(),
+        )
+
+        stock_transaction = StockTransaction.objects.create(
+            sub_variant=sub_variant,
+            quantity=quantity,
+            transaction_type=transaction_type,
+            created_by=user,
+        )
+
+        record_rollup(
+            sub_variant.variant.product_id, sub_variant.id,
+            rollup_day(stock_transaction.CreatedDate), transaction_type, quantity,
+        )
+        bump_catalog_version()
+        bump_ledger_version()
+
+    return stock_transaction
+
+
+def apply_stock_movements(movements, user):
+    
+    # Batched variant of apply_stock_movement: one locked lookup for every option in
+    # the batch, one bulk ledger insert, then one aggregated UPDATE per touched row.
+    results = []
+    ledger = []
+    option_deltas = defaultdict(Decimal)
+    product_deltas = defaultdict(Decimal)
+
+    with transaction.atomic():
+        ids = {movement['sub_variant_id'] for movement in movements}
+        options = {
+            option.id: option
+            for option in SubVariant.objects.select_for_update()
+            .select_related('variant')
+            .only('id', 'sku', 'stock', 'reorder_level', 'variant__product')
+            .filter(id__in=ids)
+        }
+        balances = {pk: option.stock for pk, option in options.items()}
+
+        for index, movement in enumerate(movements):
+            option = options.get(movement['sub_variant_id'])
+            if option is None:
+                results.append({'index': index, 'status': 'error', 'error': "Sub-variant not found"})
+                continue
+
+            delta = stock_delta(movement['quantity'], movement['transaction_type'])
+            if balances[option.id] + delta < 0:
+                results.append({'index': index, 'status': 'error', 'error': "Insufficient stock"})
+                continue
+
+            balances[option.id] += delta
+            option_deltas[option.id] += delta
+            product_deltas[option.variant.product_id] += delta
+            ledger.append(StockTransaction(
+                sub_variant=option,
+                quantity=movement['quantity'],
+                transaction_type=movement['transaction_type'],
+                created_by=user,
+            ))
+            results.append({'index': index, 'status': 'ok', 'stock': balances[option.id]})
+
+        StockTransaction.objects.bulk_create(ledger)
+
+        buckets = defaultdict(lambda: [Decimal('0'), 0])
+        for row in ledger:
+            bucket = buckets[(row.sub_variant.variant.product_id, row.sub_variant_id, rollup_day(row.CreatedDate), row.transaction_type)]
+            bucket[0] += row.quantity
+            bucket[1] += 1
+        for (product_id, sub_variant_id, day, transaction_type), (quantity, count) in buckets.items():
+            record_rollup(product_id, sub_variant_id, day, transaction_type, quantity, count)
+
+        for pk, delta in option_deltas.items():
+            if delta:
+                SubVariant.objects.filter(id=pk).update(stock=F('stock') + delta)
+
+        # Net crossing over the batch: an option that dips and recovers within it raises nothing.
+        alerts = [
+            stock_alert(pk, options[pk].stock, balances[pk], options[pk].reorder_level)
+            for pk, delta in option_deltas.items() if delta
+        ]
+        StockAlert.objects.bulk_create([alert for alert in alerts if alert is not None])
+
+        now = timezone.now()
+        for pk, delta in product_deltas.items():
+            Products.objects.filter(id=pk).update(
+                TotalStock=Coalesce(F('TotalStock'), Value(0)) + delta,
+                UpdatedDate=now,
+            )
+        if product_deltas:
+            bump_catalog_version()
+            bump_ledger_version()
+
+    return results
+
+
+def set_reorder_level(sub_variant_id, reorder_level):
+    
+    with transaction.atomic():
+        options = SubVariant.objects.filter(id=sub_variant_id)
+        try:
+            stock, before = options.values_list('stock', 'reorder_level').get()
+        except SubVariant.DoesNotExist:
+            raise serializers.ValidationError("Sub-variant not found")
+        options.update(reorder_level=reorder_level)
+
+        alert = level_alert(sub_variant_id, stock, before, reorder_level)
+        if alert is not None:
+            alert.save()
+        # The product list shows each option's reorder level.
+        bump_catalog_version()
+
+    return stock, alert
@@ -0,0 +1,44 @@
+from src.Product.models import STOCK_MARGIN, StockAlert, SubVariant
+
+
+def crossing(before, after, reorder_level):
+    
+    # An option is low once its stock is at or below its reorder level; 0 means untracked.
+    if not reorder_level or reorder_level <= 0:
+        return None
+    if before > reorder_level >= after:
+        return 'LOW'
+    if before <= reorder_level < after:
+        return 'CLEARED'
+    return None
+
+
+def stock_alert(sub_variant_id, before, after, reorder_level):
+    
+    alert_type = crossing(before, after, reorder_level)
+    if alert_type is None:
+        return None
+    return StockAlert(sub_variant_id=sub_variant_id, alert_type=alert_type, stock=after, reorder_level=reorder_level)
+
+
+def is_low(stock, reorder_level):
+    
+    return bool(reorder_level) and reorder_level > 0 and stock <= reorder_level
+
+
+def level_alert(sub_variant_id, stock, before, after):
+    
+    # A new reorder level can move an option in or out of low stock without any movement.
+    if is_low(stock, before) == is_low(stock, after):
+        return None
+    alert_type = 'LOW' if is_low(stock, after) else 'CLEARED'
+    return StockAlert(sub_variant_id=sub_variant_id, alert_type=alert_type, stock=stock, reorder_level=after)
+
+
+def low_stock_queryset():
+    
+    # Matches subvariant_stock_margin_idx: same expression, same partial condition.
+    return (
+        SubVariant.objects.annotate(margin=STOCK_MARGIN)
+        .filter(reorder_level__gt=0, margin__lte=0)
+    )
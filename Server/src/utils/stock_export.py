@@ -0,0 +1,114 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, time
+
+from django.utils.dateparse import parse_date
+from django.utils.timezone import make_aware
+
+from src.Product.models import StockTransaction
+
+EXPORT_COLUMNS = {
+    'id': 'id',
+    'CreatedDate': 'CreatedDate',
+    'transaction_type': 'transaction_type',
+    'quantity': 'quantity',
+    'sku': 'sub_variant__sku',
+    'product_code': 'sub_variant__variant__product__ProductCode',
+    'product_name': 'sub_variant__variant__product__ProductName',
+    'variant_name': 'sub_variant__variant__name',
+    'option_value': 'sub_variant__value',
+    'created_by': 'created_by__email',
+}
+EXPORT_FORMATS = ('csv', 'jsonl')
+CHUNK_SIZE = 2000
+ROWS_PER_WRITE = 500
+
+
+def date_range_filters(start_date, end_date):
+    
+    filters = {}
+
+    if start_date:
+        parsed_start_date = parse_date(start_date)
+        if not parsed_start_date:
+            raise ValueError("Invalid start_date format. Use YYYY-MM-DD")
+        filters["CreatedDate__gte"] = make_aware(datetime.combine(parsed_start_date, time.min))
+
+    if end_date:
+        parsed_end_date = parse_date(end_date)
+        if not parsed_end_date:
+            raise ValueError("Invalid end_date format. Use YYYY-MM-DD")
+        filters["CreatedDate__lte"] = make_aware(datetime.combine(parsed_end_date, time.max))
+
+    return filters
+
+
+def stock_report_queryset(filters):
+    
+    return (
+        StockTransaction.objects.filter(**filters)
+        .select_related('sub_variant__variant__product')
+        .only(
+            'id', 'quantity', 'transaction_type', 'CreatedDate',
+            'sub_variant__value',
+            'sub_variant__variant__name',
+            'sub_variant__variant__product__ProductName',
+        )
+    )
+
+
+def export_rows(filters):
+    
+    # iterator() fetches in chunks (a server-side cursor where the backend has one),
+    # so memory stays flat however many rows the range holds.
+    return (
+        StockTransaction.objects.filter(**filters)
+        .order_by('CreatedDate', 'id')
+        .values_list(*EXPORT_COLUMNS.values())
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def iter_csv(rows):
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS.keys())
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % ROWS_PER_WRITE == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def iter_jsonl(rows):
+    
+    columns = list(EXPORT_COLUMNS.keys())
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, row)), default=str))
+        if len(lines) >= ROWS_PER_WRITE:
+            yield ('\n'.join(lines) + '\n').encode()
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode()
+
+
+def iter_gzip(chunks):
+    
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_stock_export(filters, file_format='csv', compress=False):
+    
+    chunks = (iter_csv if file_format == 'csv' else iter_jsonl)(export_rows(filters))
+    return iter_gzip(chunks) if compress else chunks
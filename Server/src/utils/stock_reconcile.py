@@ -0,0 +1,89 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Abs, Coalesce
+from django.utils import timezone
+
+from src.Product.models import Products, ReconcileCheckpoint, SubVariant
+from src.utils.cache import bump_catalog_version
+
+CHECKPOINT_NAME = 'TotalStockReconcile'
+# Half the last decimal place of TotalStock; SQLite sums decimals as floats.
+TOLERANCE = Decimal('0.000000005')
+ZERO = Value(Decimal('0'), output_field=DecimalField(max_digits=20, decimal_places=8))
+
+
+def load_checkpoint():
+
+    return ReconcileCheckpoint.objects.filter(name=CHECKPOINT_NAME).values_list('checked_at', flat=True).first()
+
+
+def save_checkpoint(at):
+
+    ReconcileCheckpoint.objects.update_or_create(name=CHECKPOINT_NAME, defaults={'checked_at': at})
+
+
+def find_drift(since=None):
+
+    # One grouped query: every product joined to its options, summed, and kept only
+    # where the stored total disagrees.
+    products = Products.objects.all()
+    if since is not None:
+        products = products.filter(Q(UpdatedDate__gt=since) | Q(CreatedDate__gt=since))
+
+    rows = (
+        products.annotate(actual=Coalesce(Sum('variants__options__stock'), ZERO))
+        .annotate(drift=Abs(Coalesce(F('TotalStock'), ZERO) - F('actual')))
+        .filter(Q(TotalStock__isnull=True) | Q(drift__gt=TOLERANCE))
+        .order_by('ProductCode')
+        .values_list('id', 'ProductCode', 'TotalStock', 'actual')
+    )
+    return [
+        {
+            'id': product_id,
+            'ProductCode': code,
+            'recorded': recorded,
+            'actual': actual,
+            'difference': actual - (recorded or 0),
+        }
+        for product_id, code, recorded, actual in rows
+    ]
+
+
+def option_stock_sum():
+
+    return Subquery(
+        SubVariant.objects.filter(variant__product=OuterRef('pk'))
+        .order_by()
+        .values('variant__product')
+        .annotate(total=Sum('stock'))
+        .values('total')[:1]
+    )
+
+
+def reconcile_total_stock(incremental=False, fix=True):
+
+    # The fix is one UPDATE that recomputes each drifted total from the options at write
+    # time, so a stock movement landing between the check and the fix is not overwritten.
+    started = timezone.now()
+    since = load_checkpoint() if incremental else None
+    drift = find_drift(since)
+
+    fixed = 0
+    if fix:
+        with transaction.atomic():
+            if drift:
+                fixed = Products.objects.filter(id__in=[row['id'] for row in drift]).update(
+                    TotalStock=Coalesce(option_stock_sum(), ZERO),
+                )
+                bump_catalog_version()
+            save_checkpoint(started)
+
+    return {
+        'mode': 'incremental' if incremental else 'full',
+        'since': since,
+        'checked_at': started,
+        'discrepancies': drift,
+        'fixed': fixed,
+    }
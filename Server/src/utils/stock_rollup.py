@@ -0,0 +1,65 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from src.Product.models import StockDailyRollup, StockTransaction
+
+
+def record_rollup(product_id, sub_variant_id, day, transaction_type, quantity, count=1):
+    
+    # Must run inside the stock mutation's transaction so the rollup never disagrees with the ledger.
+    bucket = StockDailyRollup.objects.filter(sub_variant_id=sub_variant_id, day=day, transaction_type=transaction_type)
+    if bucket.update(quantity=F('quantity') + quantity, transaction_count=F('transaction_count') + count):
+        return
+
+    try:
+        with transaction.atomic():
+            StockDailyRollup.objects.create(
+                product_id=product_id,
+                sub_variant_id=sub_variant_id,
+                day=day,
+                transaction_type=transaction_type,
+                quantity=quantity,
+                transaction_count=count,
+            )
+    except IntegrityError:
+        # Another writer created the bucket first.
+        bucket.update(quantity=F('quantity') + quantity, transaction_count=F('transaction_count') + count)
+
+
+def rollup_day(created):
+    
+    return timezone.localdate(created)
+
+
+def rebuild_rollups(batch_size=2000):
+    
+    grouped = (
+        StockTransaction.objects.annotate(day=TruncDate('CreatedDate'))
+        .values('sub_variant_id', 'sub_variant__variant__product_id', 'day', 'transaction_type')
+        .annotate(total=Sum('quantity'), count=Count('id'))
+        .order_by()
+    )
+
+    created = 0
+    with transaction.atomic():
+        StockDailyRollup.objects.all().delete()
+        batch = []
+        for row in grouped.iterator(chunk_size=batch_size):
+            batch.append(StockDailyRollup(
+                product_id=row['sub_variant__variant__product_id'],
+                sub_variant_id=row['sub_variant_id'],
+                day=row['day'],
+                transaction_type=row['transaction_type'],
+                quantity=row['total'],
+                transaction_count=row['count'],
+            ))
+            if len(batch) >= batch_size:
+                StockDailyRollup.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        StockDailyRollup.objects.bulk_create(batch)
+        created += len(batch)
+
+    return created
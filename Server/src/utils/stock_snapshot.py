@@ -0,0 +1,96 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Sum, When
+from django.utils import timezone
+
+from src.Product.models import SubVariant, StockSnapshot, StockTransaction
+
+SIGNED_QUANTITY = Case(
+    When(transaction_type='IN', then=F('quantity')),
+    default=-F('quantity'),
+    output_field=DecimalField(max_digits=20, decimal_places=8),
+)
+
+
+def take_snapshot(batch_size=2000):
+    
+    # Reads balances and writes the checkpoint in one transaction so it matches the ledger at taken_at.
+    # The transaction is IMMEDIATE (see DATABASES), so the write lock is held before taken_at is
+    # stamped: every movement stamped earlier has committed and every later one waits for us.
+    created = 0
+    with transaction.atomic():
+        taken_at = timezone.now()
+        batch = []
+        for sub_variant_id, stock in SubVariant.objects.values_list('id', 'stock').iterator(chunk_size=batch_size):
+            batch.append(StockSnapshot(sub_variant_id=sub_variant_id, taken_at=taken_at, stock=stock))
+            if len(batch) >= batch_size:
+                StockSnapshot.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        StockSnapshot.objects.bulk_create(batch)
+        created += len(batch)
+    return taken_at, created
+
+
+def ledger_delta(sub_variant_id, after, until):
+    
+    # Net movement in (after, until]; either bound may be None for an open range.
+    transactions = StockTransaction.objects.filter(sub_variant_id=sub_variant_id)
+    if after is not None:
+        transactions = transactions.filter(CreatedDate__gt=after)
+    if until is not None:
+        transactions = transactions.filter(CreatedDate__lte=until)
+    return transactions.aggregate(total=Sum(SIGNED_QUANTITY))['total'] or Decimal('0')
+
+
+def stock_as_of(sub_variant, at):
+    
+    # Start from whichever checkpoint is closest in time (the live balance counts as one)
+    # and apply only the ledger rows between it and `at`.
+    now = timezone.now()
+    if at >= now:
+        return sub_variant.stock
+
+    snapshots = StockSnapshot.objects.filter(sub_variant=sub_variant).only('taken_at', 'stock')
+    before = snapshots.filter(taken_at__lte=at).order_by('-taken_at').first()
+    after = snapshots.filter(taken_at__gt=at).order_by('taken_at').first()
+
+    checkpoints = [(now - at, 'after', now, sub_variant.stock)]
+    if after:
+        checkpoints.append((after.taken_at - at, 'after', after.taken_at, after.stock))
+    if before:
+        checkpoints.append((at - before.taken_at, 'before', before.taken_at, before.stock))
+    _, direction, taken_at, stock = min(checkpoints, key=lambda checkpoint: checkpoint[0])
+
+    if direction == 'before':
+        return stock + ledger_delta(sub_variant.id, taken_at, at)
+    return stock - ledger_delta(sub_variant.id, at, taken_at)
+
+
+def compact_snapshots(keep_days=30, weekly_days=365):
+    
+    # Every checkpoint from the last keep_days, the last one per ISO week up to weekly_days,
+    # and the last one per month beyond that.
+    now = timezone.now()
+    kept = {}
+    for taken_at in StockSnapshot.objects.values_list('taken_at', flat=True).distinct().order_by('taken_at'):
+        age = now - taken_at
+        if age <= timedelta(days=keep_days):
+            bucket = taken_at
+        elif age <= timedelta(days=weekly_days):
+            bucket = ('week',) + tuple(taken_at.isocalendar()[:2])
+        else:
+            bucket = ('month', taken_at.year, taken_at.month)
+        kept[bucket] = taken_at
+
+    keep = set(kept.values())
+    drop = [
+        taken_at for taken_at in StockSnapshot.objects.values_list('taken_at', flat=True).distinct()
+        if taken_at not in keep
+    ]
+    deleted = 0
+    for start in range(0, len(drop), 500):
+        deleted += StockSnapshot.objects.filter(taken_at__in=drop[start:start + 500]).delete()[0]
+    return deleted